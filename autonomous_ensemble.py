@@ -9,18 +9,36 @@ and automated vulnerability scanning.
 """
 
 import argparse
+import difflib
+import hashlib
 import json
 import logging
+import mmap
 import os
+import random
 import re
 import sys
+import tempfile
+import threading
 import time
 import uuid
-from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import Callable, Dict, List, Optional
+from types import TracebackType
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
-import requests
+# requests is imported when OllamaClient opens its first session, so --help
+# and --dry-run (which build a client but never query) don't load it or urllib3
+if TYPE_CHECKING:
+    import requests
+
+# Use orjson for checkpoint/response (de)serialization when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Import optional monitoring modules
 try:
@@ -45,6 +63,52 @@ except ImportError:
 
 logger = get_logger(__name__)
 
+# Slotted dataclasses need Python 3.10+; older versions keep the __dict__ layout
+_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def _json_loads(data: Any) -> Any:
+    """Parse JSON from str or bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # NaN/Infinity or integers beyond 64 bits; let json decide
+    return json.loads(data)
+
+
+# Below this size reading into bytes beats setting up a memory map
+_MMAP_MIN_SIZE = 256 * 1024
+
+
+def _json_load_file(f: IO[bytes]) -> Any:
+    """
+    Parse JSON from an open binary file.
+
+    Large files are memory-mapped and handed to orjson directly, which
+    skips copying the whole file into a bytes object first.
+    """
+    if ORJSON_AVAILABLE and os.fstat(f.fileno()).st_size >= _MMAP_MIN_SIZE:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return orjson.loads(view)
+            except orjson.JSONDecodeError:
+                pass  # let _json_loads retry with json below
+            finally:
+                view.release()
+    return _json_loads(f.read())
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass  # e.g. lone surrogates or integers beyond 64 bits
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
 
 # =============================================================================
 # Section 4.1: Configuration Object
@@ -64,12 +128,25 @@ class Config:
     max_iterations: int = 3
     output_file: str = "final_output.txt"
     verbose: bool = False
+    cache_dir: Optional[str] = None         # Response cache directory (None disables)
+    cache_all: bool = False                 # Also cache calls with temperature > 0
+    stream: bool = True                     # Stream responses from Ollama as NDJSON
+    keep_alive: str = "10m"                 # How long Ollama keeps each model loaded
+    convergence_similarity: float = 1.0     # Stop B/C iterations at this similarity (1.0 = exact)
+    speculative_security: bool = False      # Run Model C on the draft alongside Model B
+    checkpoint_durable: bool = False        # fsync checkpoint writes
+
+    # Set once .env has been applied to os.environ (not a dataclass field)
+    _dotenv_loaded = False
 
     @classmethod
-    def from_json(cls, path: str) -> "Config":
-        """Load configuration from a JSON file."""
-        with open(path, "r") as f:
-            data = json.load(f)
+    def from_json(cls, source: Union[str, IO]) -> "Config":
+        """Load configuration from a JSON file path or readable file object."""
+        if hasattr(source, "read"):
+            data = _json_loads(source.read())
+        else:
+            with open(source, "rb") as f:
+                data = _json_loads(f.read())
         return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
 
     @classmethod
@@ -79,13 +156,19 @@ class Config:
 
         Supports loading from .env file if python-dotenv is available.
         Environment variables override defaults.
+
+        The .env file is read on the first call only; its values stay in
+        os.environ, and load_dotenv never overrides variables that are
+        already set, so later calls would find nothing new to apply.
         """
         # Try to load .env file if dotenv is available
-        try:
-            from dotenv import load_dotenv
-            load_dotenv()
-        except ImportError:
-            pass  # dotenv not installed, use existing env vars
+        if not Config._dotenv_loaded:
+            try:
+                from dotenv import load_dotenv
+                load_dotenv()
+            except ImportError:
+                pass  # dotenv not installed, use existing env vars
+            Config._dotenv_loaded = True
 
         def get_env(key: str, default: str) -> str:
             return os.environ.get(key, default)
@@ -117,7 +200,14 @@ class Config:
             max_tokens=get_env_int("MAX_TOKENS", cls.max_tokens),
             max_iterations=get_env_int("MAX_ITERATIONS", cls.max_iterations),
             output_file=get_env("OUTPUT_FILE", cls.output_file),
-            verbose=get_env_bool("VERBOSE", cls.verbose)
+            verbose=get_env_bool("VERBOSE", cls.verbose),
+            cache_dir=os.environ.get("CACHE_DIR", cls.cache_dir),
+            cache_all=get_env_bool("CACHE_ALL", cls.cache_all),
+            stream=get_env_bool("STREAM", cls.stream),
+            keep_alive=get_env("KEEP_ALIVE", cls.keep_alive),
+            convergence_similarity=get_env_float("CONVERGENCE_SIMILARITY", cls.convergence_similarity),
+            speculative_security=get_env_bool("SPECULATIVE_SECURITY", cls.speculative_security),
+            checkpoint_durable=get_env_bool("CHECKPOINT_DURABLE", cls.checkpoint_durable)
         )
 
 
@@ -125,7 +215,7 @@ class Config:
 # Section 4.2: Step Processing Context
 # =============================================================================
 
-@dataclass
+@dataclass(**_SLOTS)
 class StepContext:
     """Context for processing a single step."""
     step_number: int
@@ -141,7 +231,7 @@ class StepContext:
 # Section 4.3: API Request Payload
 # =============================================================================
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class OllamaRequest:
     """Request payload for Ollama API."""
     model: str
@@ -149,10 +239,11 @@ class OllamaRequest:
     temperature: float
     max_tokens: int = 2000
     stream: bool = False
+    keep_alive: Optional[str] = None
 
     def to_dict(self) -> dict:
         """Convert to API request dictionary."""
-        return {
+        payload = {
             "model": self.model,
             "prompt": self.prompt,
             "options": {
@@ -161,6 +252,13 @@ class OllamaRequest:
             },
             "stream": self.stream
         }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def to_json_bytes(self) -> bytes:
+        """Serialize the API request body to UTF-8 JSON bytes."""
+        return _json_dumps(self.to_dict())
 
 
 # =============================================================================
@@ -178,9 +276,20 @@ class GuideLoader:
         Step N: [Action description]
     """
 
-    STEP_PATTERN = re.compile(r"^Step\s+(\d+):\s*(.+)$", re.IGNORECASE)
+    # Matched against the whole file in one pass; [ \t] rather than \s so a
+    # match can never span a line break.
+    STEP_PATTERN = re.compile(r"^[ \t]*Step[ \t]+(\d+):[ \t]*(\S.*)$", re.IGNORECASE | re.MULTILINE)
+    # Same pattern for files read as bytes; only matched steps get decoded
+    _STEP_PATTERN_BYTES = re.compile(STEP_PATTERN.pattern.encode(), re.IGNORECASE | re.MULTILINE)
+
+    # Parsed steps keyed by (absolute path, inode, mtime_ns, size), shared by
+    # all loaders so re-loading an unchanged guide skips the read and parse
+    CACHE_SIZE = 64
+    _cache: Dict[tuple, List[str]] = {}
+    # Guides may be loaded from worker threads (GuideChain.dry_run)
+    _cache_lock = threading.Lock()
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: Union[str, IO]):
         self.file_path = file_path
         self.steps: List[str] = []
 
@@ -195,46 +304,108 @@ class GuideLoader:
             FileNotFoundError: If guide file doesn't exist.
             ValueError: If no valid steps found in guide.
         """
-        if not os.path.exists(self.file_path):
-            available = self._list_available_guides()
+        source = self.file_path
+        if not isinstance(source, (str, os.PathLike)):
+            # Already-open guides have no stat signature, so bypass the cache
+            name = str(getattr(source, "name", "<stream>"))
+            content = source.read()
+            if isinstance(content, str):
+                self.steps = self._parse_text(content, name)
+            else:
+                self.steps = self._parse_bytes(content, name)
+            return self.steps
+
+        path = os.fspath(source)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            available = self._list_available_guides(path)
             raise FileNotFoundError(
-                f"Guide file not found: {self.file_path}\n"
+                f"Guide file not found: {path}\n"
                 f"Available guides: {', '.join(available) if available else 'none'}"
-            )
+            ) from None
+
+        cache_key = (os.path.abspath(path), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+        if cached is not None:
+            self.steps = list(cached)
+            return self.steps
+
+        with open(path, "rb") as f:
+            if stat.st_size >= _MMAP_MIN_SIZE:
+                # Match against the mapped file instead of copying it into bytes
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    self.steps = self._parse_bytes(mapped, path)
+            else:
+                self.steps = self._parse_bytes(f.read(), path)
+
+        with self._cache_lock:
+            cache = self._cache
+            if cache_key not in cache and len(cache) >= self.CACHE_SIZE:
+                del cache[next(iter(cache))]
+            cache[cache_key] = list(self.steps)
+        return self.steps
 
-        steps_dict = {}
+    def _parse_text(self, content: str, name: str) -> List[str]:
+        """Extract ordered step descriptions from guide text."""
+        if "\r" in content:
+            # Match text mode's universal newlines
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        matches = (
+            (int(m.group(1)), m.group(2).strip(), m.start())
+            for m in self.STEP_PATTERN.finditer(content)
+        )
+        return self._collect_steps(matches, lambda pos: content.count("\n", 0, pos) + 1, name)
+
+    def _parse_bytes(self, content: Union[bytes, mmap.mmap], name: str) -> List[str]:
+        """Extract ordered step descriptions from UTF-8 guide bytes, or a memory map of them."""
+        if content.find(b"\r") != -1:
+            # Match text mode's universal newlines
+            content = content[:].replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        matches = (
+            (int(m.group(1)), m.group(2).strip().decode("utf-8"), m.start())
+            for m in self._STEP_PATTERN_BYTES.finditer(content)
+        )
+        return self._collect_steps(matches, lambda pos: content[:pos].count(b"\n") + 1, name)
+
+    @staticmethod
+    def _collect_steps(matches: Iterable[Tuple[int, str, int]],
+                       line_of: Callable[[int], int], name: str) -> List[str]:
+        """Order (step number, description, offset) matches, rejecting duplicates and empty guides."""
+        steps_dict: Dict[int, str] = {}
         duplicates = []
-        with open(self.file_path, "r") as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                match = self.STEP_PATTERN.match(line)
-                if match:
-                    step_num = int(match.group(1))
-                    step_desc = match.group(2).strip()
-                    if step_num in steps_dict:
-                        duplicates.append((step_num, line_num))
-                    steps_dict[step_num] = step_desc
+        for step_num, description, offset in matches:
+            if step_num in steps_dict:
+                duplicates.append((step_num, line_of(offset)))
+            steps_dict[step_num] = description
 
         if duplicates:
             dup_info = ", ".join(f"Step {n} (line {ln})" for n, ln in duplicates)
             raise ValueError(
-                f"Duplicate step numbers found in {self.file_path}: {dup_info}\n"
+                f"Duplicate step numbers found in {name}: {dup_info}\n"
                 "Each step number must be unique."
             )
 
         if not steps_dict:
             raise ValueError(
-                f"No valid steps found in {self.file_path}\n"
+                f"No valid steps found in {name}\n"
                 "Expected format: 'Step N: [description]'"
             )
 
         # Return steps in order
-        self.steps = [steps_dict[i] for i in sorted(steps_dict.keys())]
-        return self.steps
+        return [steps_dict[i] for i in sorted(steps_dict.keys())]
 
-    def _list_available_guides(self) -> List[str]:
-        """List available guide files in the current directory."""
-        directory = os.path.dirname(self.file_path) or "."
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Forget all cached guides."""
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    @staticmethod
+    def _list_available_guides(path: str) -> List[str]:
+        """List available guide files in the directory of path."""
+        directory = os.path.dirname(path) or "."
         if os.path.isdir(directory):
             return [f for f in os.listdir(directory) if f.endswith("_guide.txt")]
         return []
@@ -244,30 +415,76 @@ class GuideLoader:
 # Section 3.4: State Manager
 # =============================================================================
 
-@dataclass
+@dataclass(init=False)
 class StateManager:
-    """Manages workflow state across step processing."""
-    cumulative_output: str = ""
-    current_step_index: int = 0
-    step_outputs: List[str] = field(default_factory=list)
+    """
+    Manages workflow state across step processing.
+
+    Formatted step outputs are kept as a list of chunks and joined only when
+    the cumulative output is read, so adding a step never re-copies the
+    output of all previous steps. A step output identical to one of the
+    last STEP_POOL_SIZE distinct outputs shares its string object in
+    step_outputs.
+    """
+    current_step_index: int
+    step_outputs: List[str]
+    _chunks: List[str] = field(repr=False)
+    _joined: Optional[str] = field(repr=False, compare=False)
+    _pool: Dict[str, str] = field(repr=False, compare=False)
+
+    # Distinct step outputs remembered for sharing
+    STEP_POOL_SIZE = 64
+
+    def __init__(self, cumulative_output: str = "", current_step_index: int = 0,
+                 step_outputs: Optional[List[str]] = None):
+        self.cumulative_output = cumulative_output
+        self.current_step_index = current_step_index
+        self.step_outputs = [] if step_outputs is None else step_outputs
+        self._pool = {}
+
+    @property
+    def cumulative_output(self) -> str:
+        """Concatenated output from all completed steps."""
+        if self._joined is None:
+            self._joined = "".join(self._chunks)
+        return self._joined
+
+    @cumulative_output.setter
+    def cumulative_output(self, value: str) -> None:
+        self._chunks = [value] if value else []
+        self._joined = value
 
     def add_step_output(self, output: str) -> None:
         """Add output from a completed step."""
+        pool = self._pool
+        pooled = pool.get(output)
+        if pooled is None:
+            if len(pool) >= self.STEP_POOL_SIZE:
+                del pool[next(iter(pool))]
+            pool[output] = output
+        else:
+            output = pooled
         self.step_outputs.append(output)
-        formatted = f"\n--- Step {self.current_step_index + 1} Output ---\n{output}\n"
-        self.cumulative_output += formatted
+        formatted = self.format_step_output(self.current_step_index + 1, output)
+        self._chunks.append(formatted)
+        self._joined = None
         self.current_step_index += 1
 
     def get_context(self) -> str:
         """Get cumulative output as context for next step."""
         return self.cumulative_output
 
+    @staticmethod
+    def format_step_output(step_number: int, output: str) -> str:
+        """Format a step's output as it appears in the cumulative output."""
+        return f"\n--- Step {step_number} Output ---\n{output}\n"
+
 
 # =============================================================================
 # Section 10.3: Checkpoint/Resume
 # =============================================================================
 
-@dataclass
+@dataclass(**_SLOTS)
 class Checkpoint:
     """Checkpoint state for workflow resumption."""
     guide_file: str
@@ -331,24 +548,96 @@ class Checkpoint:
             timestamp=data["timestamp"]
         )
 
-    def save(self, path: str) -> None:
-        """Save checkpoint to file."""
-        with open(path, "w") as f:
-            json.dump(self.to_dict(), f, indent=2)
+    def save(self, path: Union[str, IO], durable: bool = False) -> None:
+        """
+        Save checkpoint to a file path or writable binary file object.
+
+        The checkpoint is written to a temporary file in the same directory
+        and renamed over path, so a crash mid-write leaves the previous
+        checkpoint intact. With durable=True the data is fsynced before the
+        rename. A file object is written directly; syncing it is left to
+        the caller that owns it.
+        """
+        if hasattr(path, "write"):
+            path.write(_json_dumps(self.to_dict(), indent=True))
+            return
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_json_dumps(self.to_dict(), indent=True))
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: Union[str, IO]) -> "Checkpoint":
+        """
+        Load checkpoint from a file path or readable file object.
+
+        Steps recorded in the journal next to the checkpoint (see
+        append_step) are replayed on top of the saved snapshot. A file
+        object has no journal location, so only its snapshot is read.
+        """
+        if hasattr(path, "read"):
+            return cls.from_dict(_json_loads(path.read()))
+        with open(path, "rb") as f:
+            data = _json_load_file(f)
+        checkpoint = cls.from_dict(data)
+        checkpoint._apply_journal(cls.journal_path(path))
+        return checkpoint
+
+    @staticmethod
+    def journal_path(path: str) -> str:
+        """Path of the append-only step journal for a checkpoint file."""
+        return path + ".jsonl"
 
     @classmethod
-    def load(cls, path: str) -> "Checkpoint":
-        """Load checkpoint from file."""
-        with open(path, "r") as f:
-            data = json.load(f)
-        return cls.from_dict(data)
+    def append_step(cls, path: str, step_number: int, output: str, timestamp: str,
+                    durable: bool = False) -> None:
+        """
+        Record one completed step in the checkpoint's journal.
+
+        Appending costs O(step output) instead of rewriting the full
+        snapshot, whose cumulative output grows with every step.
+        """
+        entry = {"step": step_number, "output": output, "timestamp": timestamp}
+        with open(cls.journal_path(path), "ab") as f:
+            f.write(_json_dumps(entry) + b"\n")
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _apply_journal(self, journal: str) -> None:
+        """Replay journal entries newer than this snapshot."""
+        if not os.path.exists(journal):
+            return
+
+        parts = [self.cumulative_output]
+        with open(journal, "rb") as f:
+            for line in f:
+                try:
+                    entry = _json_loads(line)
+                except ValueError:
+                    break  # Torn write from an interrupted run
+                if entry["step"] <= self.completed_steps:
+                    continue
+                self.step_outputs.append(entry["output"])
+                parts.append(StateManager.format_step_output(entry["step"], entry["output"]))
+                self.completed_steps = entry["step"]
+                self.timestamp = entry["timestamp"]
+        self.cumulative_output = "".join(parts)
 
 
 # =============================================================================
 # Section 10.1: Custom Model Hooks
 # =============================================================================
 
-@dataclass
+@dataclass(**_SLOTS)
 class PipelineHooks:
     """Optional hooks for custom processing between pipeline stages."""
     post_draft: Optional[Callable[[str], str]] = None
@@ -356,22 +645,155 @@ class PipelineHooks:
     post_security: Optional[Callable[[str], str]] = None
 
 
+# =============================================================================
+# Response Cache
+# =============================================================================
+
+class ResponseCache:
+    """
+    Disk-backed exact-match cache of model responses.
+
+    Entries are keyed on (model, temperature, max_tokens, prompt) and stored
+    as one JSON file per key, so repeated runs and resumed workflows can
+    replay identical requests without querying the model again.
+    """
+
+    DEFAULT_DIR = os.path.join(
+        os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+        "autonomous_ensemble"
+    )
+
+    def __init__(self, cache_dir: str = DEFAULT_DIR):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(request: OllamaRequest) -> str:
+        """Build the cache key for a request."""
+        raw = f"{request.model}|{request.temperature}|{request.max_tokens}|{request.prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None on a miss."""
+        try:
+            with open(self._path(key), "rb") as f:
+                response = _json_loads(f.read())["response"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return response if isinstance(response, str) else None
+
+    def set(self, key: str, response: str) -> None:
+        """
+        Store a response under a key.
+
+        Written to a temporary file and renamed into place, like
+        Checkpoint.save, so a crash or a concurrent run never leaves a
+        truncated entry behind.
+        """
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_json_dumps({"response": response}))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
 # =============================================================================
 # Ollama API Client
 # =============================================================================
 
 class OllamaClient:
-    """Client for interacting with Ollama API."""
+    """
+    Client for interacting with Ollama API.
+
+    Each thread gets one keep-alive session (requests.Session is not
+    thread-safe), shared by all of that thread's queries so the TCP
+    connection to the server is reused across pipeline stages and steps.
+    """
 
     def __init__(self, config: Config):
         self.config = config
         self.retry_count = 3
         self.retry_delay = 1.0
+        self.max_retry_delay = 30.0
+        self._local = threading.local()
+        self._sessions: List["requests.Session"] = []
+        self._sessions_lock = threading.Lock()
+        self._environment: Optional[tuple] = None
+        self.cache = ResponseCache(config.cache_dir) if config.cache_dir else None
+
+    @property
+    def session(self) -> "requests.Session":
+        """The calling thread's keep-alive session, created on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._new_session()
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def _new_session(self) -> "requests.Session":
+        """Create a session configured for the Ollama API."""
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        # Retries are handled in query() so they can be logged and backed off
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        # Request bodies are pre-encoded (see _post), so declare them as JSON here
+        session.headers["Content-Type"] = "application/json"
+        # requests re-resolves proxies, CA bundle and ~/.netrc from the
+        # environment on every call; resolve them once for the API URL instead,
+        # and give every thread's session the same settings
+        if self._environment is None:
+            env = session.merge_environment_settings(self.config.ollama_api, {}, None, None, None)
+            self._environment = (env["proxies"], env["verify"],
+                                 requests.utils.get_netrc_auth(self.config.ollama_api))
+        proxies, session.verify, session.auth = self._environment
+        session.proxies.update(proxies)
+        session.trust_env = False
+        return session
+
+    def close_session(self) -> None:
+        """Close the calling thread's session, e.g. before a worker thread exits."""
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            del self._local.session
+            with self._sessions_lock:
+                self._sessions.remove(session)
+            session.close()
+
+    def close(self) -> None:
+        """Close every thread's HTTP session and release pooled connections."""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+
+    def __enter__(self) -> "OllamaClient":
+        return self
+
+    def __exit__(self, exc_type: Optional[type], exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self.close()
 
     def query(self, request: OllamaRequest) -> str:
         """
         Send a query to the Ollama API.
 
+        Deterministic requests (temperature 0, or any request when
+        ``cache_all`` is set) are served from the response cache if enabled.
+
         Args:
             request: The OllamaRequest to send.
 
@@ -382,21 +804,44 @@ class OllamaClient:
             ConnectionError: If unable to connect after retries.
             RuntimeError: If server returns non-retryable error.
         """
+        cache_key = None
+        if self.cache and (request.temperature == 0 or self.config.cache_all):
+            cache_key = ResponseCache.make_key(request)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Cache hit for model %s", request.model, extra={"cached": True})
+                return cached
+
+        response_text = self._post(request)
+        if self.cache and cache_key:
+            self.cache.set(cache_key, response_text)
+        return response_text
+
+    def _post(self, request: OllamaRequest) -> str:
+        """Send the request to the Ollama API with retries."""
+        import requests
+
         last_error = None
+        # Encode once; retries resend the same bytes
+        body = request.to_json_bytes()
         for attempt in range(self.retry_count):
             try:
-                response = requests.post(
+                response = self.session.post(
                     self.config.ollama_api,
-                    json=request.to_dict(),
-                    timeout=120
+                    data=body,
+                    timeout=120,
+                    stream=request.stream
                 )
                 response.raise_for_status()
-                return response.json().get("response", "")
-            except requests.exceptions.ConnectionError as e:
+                if request.stream:
+                    return self._read_stream(response)
+                return _json_loads(response.content).get("response", "")
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                # ChunkedEncodingError: the connection broke mid-stream
                 last_error = e
                 logger.warning(f"Connection error (attempt {attempt + 1}/{self.retry_count}): {e}")
                 if attempt < self.retry_count - 1:
-                    time.sleep(self.retry_delay * (2 ** attempt))
+                    time.sleep(self._backoff_delay(attempt))
                 else:
                     raise ConnectionError(
                         f"Failed to connect to Ollama API at {self.config.ollama_api} "
@@ -406,7 +851,7 @@ class OllamaClient:
                 last_error = e
                 logger.warning(f"Timeout (attempt {attempt + 1}/{self.retry_count})")
                 if attempt < self.retry_count - 1:
-                    time.sleep(self.retry_delay)
+                    time.sleep(self._backoff_delay(attempt))
                 else:
                     raise TimeoutError(
                         f"Timeout waiting for model response after {self.retry_count} attempts"
@@ -418,20 +863,74 @@ class OllamaClient:
                 if 500 <= status_code < 600:
                     logger.warning(f"Server error {status_code} (attempt {attempt + 1}/{self.retry_count})")
                     if attempt < self.retry_count - 1:
-                        time.sleep(self.retry_delay * (2 ** attempt))
+                        retry_after = e.response.headers.get("Retry-After") if e.response is not None else None
+                        time.sleep(self._backoff_delay(attempt, retry_after))
                         continue
                 # Don't retry on 4xx client errors
                 raise RuntimeError(
                     f"Ollama API error (HTTP {status_code}): {e}"
                 )
-        # All code paths either return or raise, this is unreachable
-        raise RuntimeError(f"Unexpected state: retry loop completed without return or exception. Last error: {last_error}")
+        # Only reached when retry_count < 1
+        raise RuntimeError(f"No request attempted (retry_count={self.retry_count}). Last error: {last_error}")
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Seconds to wait before the next attempt.
+
+        Honors a numeric Retry-After header, otherwise uses exponential backoff
+        capped at max_retry_delay with +/-50% jitter so concurrent clients
+        don't retry against a busy server in lockstep.
+        """
+        if retry_after:
+            try:
+                return min(self.max_retry_delay, max(0.0, float(retry_after)))
+            except ValueError:
+                pass  # HTTP-date form; fall back to backoff
+        delay = min(self.max_retry_delay, self.retry_delay * 2.0 ** attempt)
+        return delay * random.uniform(0.5, 1.5)
+
+    @staticmethod
+    def _read_stream(response: "requests.Response") -> str:
+        """
+        Collect the text of a streamed (NDJSON) Ollama response.
+
+        Raises:
+            requests.exceptions.ConnectionError: If the stream ends before the
+                server marks the response done, e.g. a dropped connection.
+        """
+        import requests
+
+        chunks = []
+        try:
+            # Larger reads than the 512-byte default; iter_lines rejoins split lines
+            for line in response.iter_lines(chunk_size=8192):
+                if not line:
+                    continue
+                data = _json_loads(line)
+                if "error" in data:
+                    raise RuntimeError(f"Ollama API error: {data['error']}")
+                chunks.append(data.get("response", ""))
+                if data.get("done"):
+                    return "".join(chunks)
+        finally:
+            response.close()
+        # A partial response must not be cached or passed to the next model
+        raise requests.exceptions.ConnectionError("Response stream ended before it was done")
 
 
 # =============================================================================
 # Section 3.2 & 3.3: Model Pipeline & Iteration Controller
 # =============================================================================
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _norm_hash(text: str) -> str:
+    """Hash text with whitespace normalized, for convergence checks."""
+    normalized = _WHITESPACE_RE.sub(" ", text.strip())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
 class ModelPipeline:
     """
     Three-stage model pipeline for code processing.
@@ -441,6 +940,14 @@ class ModelPipeline:
     Model C (Adversarial): Security hardening with iteration
     """
 
+    # Iteration prompts are laid out as <fixed prefix><current output><suffix>
+    # so successive iterations of a stage share a byte-identical prefix, which
+    # lets Ollama reuse its KV cache for the (often long) previous output.
+    CORRECTION_INSTRUCTION = "Strictly analyze this for errors, bugs, inefficiencies:\n"
+    CORRECTION_SUFFIX = "\nCorrect without adding new features."
+    SECURITY_INSTRUCTION = "Act as a hacker: Identify security flaws in the following and suggest fixes:\n"
+    SECURITY_SUFFIX = "\nList vulnerabilities and provide corrected code."
+
     def __init__(self, config: Config, client: OllamaClient, hooks: Optional[PipelineHooks] = None):
         self.config = config
         self.client = client
@@ -461,13 +968,17 @@ class ModelPipeline:
         if self.hooks.post_draft:
             context.draft = self.hooks.post_draft(context.draft)
 
-        # Stage 2: Error Correction (Model B) - Iterative
-        context.corrected = self._error_correction(context)
-        if self.hooks.post_correction:
-            context.corrected = self.hooks.post_correction(context.corrected)
+        if self.config.speculative_security:
+            # Stages 2 and 3 overlapped, see _speculative_correction
+            context.secured = self._speculative_correction(context)
+        else:
+            # Stage 2: Error Correction (Model B) - Iterative
+            context.corrected = self._error_correction(context)
+            if self.hooks.post_correction:
+                context.corrected = self.hooks.post_correction(context.corrected)
 
-        # Stage 3: Security Hardening (Model C) - Iterative
-        context.secured = self._security_hardening(context)
+            # Stage 3: Security Hardening (Model C) - Iterative
+            context.secured = self._security_hardening(context)
         if self.hooks.post_security:
             context.secured = self.hooks.post_security(context.secured)
 
@@ -480,7 +991,9 @@ class ModelPipeline:
             model=self.config.model_a,
             prompt=prompt,
             temperature=self.config.temp_creative,
-            max_tokens=self.config.max_tokens
+            max_tokens=self.config.max_tokens,
+            stream=self.config.stream,
+            keep_alive=self.config.keep_alive
         )
         if self.config.verbose:
             print(f"  [Model A] Generating creative draft...")
@@ -489,49 +1002,132 @@ class ModelPipeline:
     def _error_correction(self, context: StepContext) -> str:
         """Iteratively correct errors using Model B."""
         current = context.draft
+        seen = {_norm_hash(current)}
+        prefix = self._build_prefix(context, self.CORRECTION_INSTRUCTION)
         for i in range(self.config.max_iterations):
-            prompt = self._build_correction_prompt(context, current)
+            prompt = self._build_correction_prompt(context, current, prefix)
             request = OllamaRequest(
                 model=self.config.model_b,
                 prompt=prompt,
                 temperature=self.config.temp_analytical,
-                max_tokens=self.config.max_tokens
+                max_tokens=self.config.max_tokens,
+                stream=self.config.stream,
+                keep_alive=self.config.keep_alive
             )
             if self.config.verbose:
                 print(f"  [Model B] Correction iteration {i + 1}...")
             new_output = self.client.query(request)
 
-            # Convergence check
-            if new_output == current:
+            # Convergence check: whitespace-only drift or a repeat of an earlier output
+            new_hash = _norm_hash(new_output)
+            if new_hash in seen:
                 if self.config.verbose:
                     print(f"  [Model B] Converged at iteration {i + 1}")
                 break
+            seen.add(new_hash)
+            near_duplicate = self._is_near_duplicate(current, new_output)
             current = new_output
+            if near_duplicate:
+                if self.config.verbose:
+                    print(f"  [Model B] Converged (near-duplicate) at iteration {i + 1}")
+                break
         return current
 
-    def _security_hardening(self, context: StepContext) -> str:
-        """Iteratively harden security using Model C."""
-        current = context.corrected
+    def _speculative_correction(self, context: StepContext) -> str:
+        """
+        Run Model B while Model C speculatively hardens the raw draft.
+
+        Model B often leaves a clean draft unchanged; in that case the
+        speculative Model C result is used and Model B's latency is hidden.
+        Otherwise the speculative result is discarded and Model C runs on the
+        corrected output as usual. Needs OLLAMA_NUM_PARALLEL >= 2 to help.
+
+        Returns:
+            The secured output (before the post_security hook).
+        """
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            speculative = executor.submit(self._speculative_hardening, context, cancelled)
+
+            context.corrected = self._error_correction(context)
+            if self.hooks.post_correction:
+                context.corrected = self.hooks.post_correction(context.corrected)
+
+            if _norm_hash(context.corrected) == _norm_hash(context.draft):
+                if self.config.verbose:
+                    print("  [Model C] Using speculative result")
+                return speculative.result()
+        finally:
+            # A discarded run stops after its in-flight request. It queries on
+            # its own thread's session, so Model C can re-run here without
+            # waiting for it.
+            cancelled.set()
+            executor.shutdown(wait=False)
+        return self._security_hardening(context)
+
+    def _speculative_hardening(self, context: StepContext, cancelled: threading.Event) -> str:
+        """Model C on the raw draft, run on the speculative worker thread."""
+        try:
+            return self._security_hardening(context, context.draft, cancelled)
+        finally:
+            # The worker thread ends with this step; don't keep its connection
+            self.client.close_session()
+
+    def _security_hardening(self, context: StepContext, source: Optional[str] = None,
+                            cancelled: Optional[threading.Event] = None) -> str:
+        """
+        Iteratively harden security using Model C, starting from ``source`` or
+        the corrected output. Stops before the next iteration once ``cancelled``
+        is set.
+        """
+        current = context.corrected if source is None else source
+        seen = {_norm_hash(current)}
+        prefix = self._build_prefix(context, self.SECURITY_INSTRUCTION)
         for i in range(self.config.max_iterations):
-            prompt = self._build_security_prompt(context, current)
+            if cancelled is not None and cancelled.is_set():
+                break
+            prompt = self._build_security_prompt(context, current, prefix)
             request = OllamaRequest(
                 model=self.config.model_c,
                 prompt=prompt,
                 temperature=self.config.temp_adversarial,
-                max_tokens=self.config.max_tokens
+                max_tokens=self.config.max_tokens,
+                stream=self.config.stream,
+                keep_alive=self.config.keep_alive
             )
             if self.config.verbose:
                 print(f"  [Model C] Security iteration {i + 1}...")
             new_output = self.client.query(request)
 
-            # Convergence check
-            if new_output == current:
+            # Convergence check: whitespace-only drift or a repeat of an earlier output
+            new_hash = _norm_hash(new_output)
+            if new_hash in seen:
                 if self.config.verbose:
                     print(f"  [Model C] Converged at iteration {i + 1}")
                 break
+            seen.add(new_hash)
+            near_duplicate = self._is_near_duplicate(current, new_output)
             current = new_output
+            if near_duplicate:
+                if self.config.verbose:
+                    print(f"  [Model C] Converged (near-duplicate) at iteration {i + 1}")
+                break
         return current
 
+    def _is_near_duplicate(self, previous: str, new_output: str) -> bool:
+        """Check whether an iteration changed less than the configured similarity allows."""
+        threshold = self.config.convergence_similarity
+        if threshold >= 1.0:
+            return False
+        matcher = difflib.SequenceMatcher(None, previous, new_output)
+        # Cheap upper bounds first; ratio() is quadratic in the worst case
+        if matcher.real_quick_ratio() < threshold:
+            return False
+        if matcher.quick_ratio() < threshold:
+            return False
+        return matcher.ratio() >= threshold
+
     def _build_creative_prompt(self, context: StepContext) -> str:
         """Build prompt for Model A (Creative Draft)."""
         return (
@@ -540,39 +1136,58 @@ class ModelPipeline:
             f"Generate a creative draft of code or plan."
         )
 
-    def _build_correction_prompt(self, context: StepContext, current_output: str) -> str:
+    def _build_correction_prompt(self, context: StepContext, current_output: str,
+                                 prefix: Optional[str] = None) -> str:
         """Build prompt for Model B (Error Correction)."""
-        return (
-            f"{context.previous_output}\n"
-            f"Strictly analyze this for errors, bugs, inefficiencies:\n"
-            f"{current_output}\n"
-            f"Correct without adding new features."
-        )
+        if prefix is None:
+            prefix = self._build_prefix(context, self.CORRECTION_INSTRUCTION)
+        return prefix + current_output + self.CORRECTION_SUFFIX
 
-    def _build_security_prompt(self, context: StepContext, current_output: str) -> str:
+    def _build_security_prompt(self, context: StepContext, current_output: str,
+                               prefix: Optional[str] = None) -> str:
         """Build prompt for Model C (Security Scan)."""
-        return (
-            f"{context.previous_output}\n"
-            f"Act as a hacker: Identify security flaws in the following and suggest fixes:\n"
-            f"{current_output}\n"
-            f"List vulnerabilities and provide corrected code."
-        )
+        if prefix is None:
+            prefix = self._build_prefix(context, self.SECURITY_INSTRUCTION)
+        return prefix + current_output + self.SECURITY_SUFFIX
+
+    @staticmethod
+    def _build_prefix(context: StepContext, instruction: str) -> str:
+        """Build the part of an iteration prompt that is fixed for the whole step."""
+        return f"{context.previous_output}\n{instruction}"
 
 
 # =============================================================================
 # Section 5: Processing Logic - Workflow Engine
 # =============================================================================
 
+def load_spec(spec: str) -> str:
+    """
+    Resolve a specification argument to its text.
+
+    Args:
+        spec: Specification string, or path to a file containing it.
+
+    Returns:
+        The file contents if spec names an existing file, else spec itself.
+    """
+    if os.path.isfile(spec):
+        with open(spec, "r") as f:
+            return f.read()
+    return spec
+
+
 class WorkflowEngine:
     """Main workflow engine coordinating the ensemble processing."""
 
     def __init__(self, config: Config, hooks: Optional[PipelineHooks] = None,
-                 checkpoint_file: Optional[str] = None):
+                 checkpoint_file: Optional[str] = None,
+                 client: Optional[OllamaClient] = None):
         self.config = config
-        self.client = OllamaClient(config)
+        self.client = client or OllamaClient(config)
         self.pipeline = ModelPipeline(config, self.client, hooks)
         self.state = StateManager()
         self.checkpoint_file = checkpoint_file
+        self._snapshot_saved = False
 
     def run(self, spec: str, guide_file: str, resume_from: Optional[str] = None) -> str:
         """
@@ -591,10 +1206,7 @@ class WorkflowEngine:
         collector = get_collector()
 
         # Load specification
-        spec_content = spec
-        if os.path.isfile(spec):
-            with open(spec, "r") as f:
-                spec_content = f.read()
+        spec_content = load_spec(spec)
 
         # Load guide
         loader = GuideLoader(guide_file)
@@ -606,6 +1218,7 @@ class WorkflowEngine:
         logger.info(f"Starting workflow {workflow_id} with {len(steps)} steps")
 
         # Resume from checkpoint if provided
+        self._snapshot_saved = False
         start_step = 0
         if resume_from and os.path.exists(resume_from):
             checkpoint = Checkpoint.load(resume_from)
@@ -659,6 +1272,10 @@ class WorkflowEngine:
 
             print(f"  Step {i + 1} complete.")
 
+        # Compact the step journal into a full checkpoint
+        if self.checkpoint_file and os.path.exists(Checkpoint.journal_path(self.checkpoint_file)):
+            self._save_checkpoint(guide_file, spec_content, snapshot=True)
+
         # Write output
         with open(self.config.output_file, "w") as f:
             f.write(self.state.cumulative_output)
@@ -673,19 +1290,43 @@ class WorkflowEngine:
 
         return self.state.cumulative_output
 
-    def _save_checkpoint(self, guide_file: str, spec: str) -> None:
-        """Save current state to checkpoint file."""
-        checkpoint = Checkpoint(
-            guide_file=guide_file,
-            spec=spec,
-            completed_steps=self.state.current_step_index,
-            cumulative_output=self.state.cumulative_output,
-            step_outputs=self.state.step_outputs,
-            timestamp=datetime.now().isoformat()
-        )
-        checkpoint.save(self.checkpoint_file)
+    def _save_checkpoint(self, guide_file: str, spec: str, snapshot: bool = False) -> None:
+        """
+        Save current state to checkpoint file.
+
+        The first save of a run (or snapshot=True) writes the full
+        checkpoint; later saves only append the newest step to the journal.
+        Does nothing when checkpointing is off.
+        """
+        checkpoint_file = self.checkpoint_file
+        if checkpoint_file is None:
+            return
+        timestamp = datetime.now().isoformat()
+        if snapshot or not self._snapshot_saved:
+            checkpoint = Checkpoint(
+                guide_file=guide_file,
+                spec=spec,
+                completed_steps=self.state.current_step_index,
+                cumulative_output=self.state.cumulative_output,
+                step_outputs=self.state.step_outputs,
+                timestamp=timestamp
+            )
+            checkpoint.save(checkpoint_file, durable=self.config.checkpoint_durable)
+            # Only drop the journal once the snapshot that supersedes it is in place
+            journal = Checkpoint.journal_path(checkpoint_file)
+            if os.path.exists(journal):
+                os.remove(journal)
+            self._snapshot_saved = True
+        else:
+            Checkpoint.append_step(
+                checkpoint_file,
+                self.state.current_step_index,
+                self.state.step_outputs[-1],
+                timestamp,
+                durable=self.config.checkpoint_durable
+            )
         if self.config.verbose:
-            print(f"  Checkpoint saved: {self.checkpoint_file}")
+            print(f"  Checkpoint saved: {checkpoint_file}")
 
     def dry_run(self, guide_file: str) -> None:
         """Parse and validate guide without running models."""
@@ -715,6 +1356,8 @@ class GuideChain:
         self.hooks = hooks
         self.checkpoint_dir = checkpoint_dir
         self.chain_output: str = ""
+        # One client (and connection pool) shared by every guide's engine
+        self.client = OllamaClient(config)
 
     def run(self, spec: str, guide_files: List[str]) -> str:
         """
@@ -731,7 +1374,10 @@ class GuideChain:
         print(f"Chain: {' -> '.join(guide_files)}")
         print("=" * 60)
 
-        cumulative_context = ""
+        # Read a spec file once for the whole chain; later guides receive the
+        # text embedded in an enhanced spec rather than the file path.
+        spec = load_spec(spec)
+        context_parts: List[str] = []
 
         for idx, guide_file in enumerate(guide_files):
             print(f"\n[Chain {idx + 1}/{len(guide_files)}] Processing: {guide_file}")
@@ -747,34 +1393,26 @@ class GuideChain:
                 )
 
             # Create engine with accumulated context
-            engine_config = Config(
-                ollama_api=self.config.ollama_api,
-                model_a=self.config.model_a,
-                model_b=self.config.model_b,
-                model_c=self.config.model_c,
-                temp_creative=self.config.temp_creative,
-                temp_analytical=self.config.temp_analytical,
-                temp_adversarial=self.config.temp_adversarial,
-                max_tokens=self.config.max_tokens,
-                max_iterations=self.config.max_iterations,
-                output_file=f"output_{idx}_{os.path.basename(guide_file).replace('.txt', '')}.txt",
-                verbose=self.config.verbose
+            engine_config = replace(
+                self.config,
+                output_file=f"output_{idx}_{os.path.basename(guide_file).replace('.txt', '')}.txt"
             )
 
-            engine = WorkflowEngine(engine_config, self.hooks, checkpoint_file)
+            engine = WorkflowEngine(engine_config, self.hooks, checkpoint_file, client=self.client)
 
             # Prepend accumulated context to spec
             enhanced_spec = spec
-            if cumulative_context:
-                enhanced_spec = f"Previous context:\n{cumulative_context}\n\nCurrent spec:\n{spec}"
+            if context_parts:
+                enhanced_spec = f"Previous context:\n{''.join(context_parts)}\n\nCurrent spec:\n{spec}"
 
             # Run this guide
             output = engine.run(enhanced_spec, guide_file)
 
             # Accumulate output for next guide
-            cumulative_context += f"\n\n--- Output from {guide_file} ---\n{output}"
+            context_parts.append(f"\n\n--- Output from {guide_file} ---\n{output}")
 
         # Write final combined output
+        cumulative_context = "".join(context_parts)
         self.chain_output = cumulative_context
         final_output_file = self.config.output_file
         with open(final_output_file, "w") as f:
@@ -791,13 +1429,15 @@ class GuideChain:
         print("-" * 60)
 
         total_steps = 0
-        for idx, guide_file in enumerate(guide_files):
-            loader = GuideLoader(guide_file)
-            steps = loader.load()
-            total_steps += len(steps)
-            print(f"\n[{idx + 1}] {guide_file}: {len(steps)} steps")
-            for i, step in enumerate(steps, 1):
-                print(f"    Step {i}: {step[:60]}...")
+        # Guides are loaded concurrently; map() yields results (and re-raises
+        # load errors) in chain order, so the report reads the same as before
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(guide_files)))) as executor:
+            results = executor.map(lambda path: GuideLoader(path).load(), guide_files)
+            for idx, (guide_file, steps) in enumerate(zip(guide_files, results)):
+                total_steps += len(steps)
+                print(f"\n[{idx + 1}] {guide_file}: {len(steps)} steps")
+                for i, step in enumerate(steps, 1):
+                    print(f"    Step {i}: {step[:60]}...")
 
         print("-" * 60)
         print(f"Chain validation successful. Total steps: {total_steps}")
@@ -807,8 +1447,8 @@ class GuideChain:
 # Section 9: CLI Interface
 # =============================================================================
 
-def parse_args() -> argparse.Namespace:
-    """Parse command-line arguments."""
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments (argv defaults to sys.argv[1:])."""
     parser = argparse.ArgumentParser(
         prog="autonomous_ensemble.py",
         description="Autonomous Coding Ensemble System - Multi-agent AI for code generation and security hardening"
@@ -855,6 +1495,12 @@ def parse_args() -> argparse.Namespace:
         help="Path to checkpoint file for saving progress after each step"
     )
 
+    parser.add_argument(
+        "--checkpoint-durable",
+        action="store_true",
+        help="fsync checkpoint writes so they survive power loss (slower)"
+    )
+
     parser.add_argument(
         "--resume",
         help="Path to checkpoint file to resume from"
@@ -872,12 +1518,27 @@ def parse_args() -> argparse.Namespace:
         help="Directory to store checkpoints when using guide chaining"
     )
 
-    return parser.parse_args()
+    # Response cache arguments
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=ResponseCache.DEFAULT_DIR,
+        metavar="DIR",
+        help=f"Cache deterministic model responses on disk (default dir: {ResponseCache.DEFAULT_DIR})"
+    )
+
+    parser.add_argument(
+        "--cache-all",
+        action="store_true",
+        help="With --cache, also cache responses from non-zero temperature calls"
+    )
+
+    return parser.parse_args(argv)
 
 
-def main() -> int:
-    """Main entry point."""
-    args = parse_args()
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main entry point; argv defaults to sys.argv[1:]."""
+    args = parse_args(argv)
 
     # Load configuration
     if args.config:
@@ -888,6 +1549,12 @@ def main() -> int:
     # Apply CLI overrides
     config.output_file = args.output
     config.verbose = args.verbose
+    if args.cache:
+        config.cache_dir = args.cache
+    if args.cache_all:
+        config.cache_all = True
+    if args.checkpoint_durable:
+        config.checkpoint_durable = True
 
     try:
         # Guide Chaining mode
@@ -12,10 +12,18 @@ import signal
 import sys
 import threading
 import time
-from dataclasses import asdict, dataclass, field
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Import telemetry if available
 try:
@@ -25,6 +33,27 @@ except ImportError:
     get_collector = lambda: None
 
 
+# (second, "YYYY-MM-DDTHH:MM:SS") cache for _fast_iso_now
+_iso_second_cache: Tuple[Optional[int], str] = (None, "")
+
+
+def _fast_iso_now() -> str:
+    """
+    Current local time in datetime.now().isoformat() format.
+
+    The seconds part is formatted at most once per second; only the
+    microseconds are formatted per call.
+    """
+    global _iso_second_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _iso_second_cache
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+        _iso_second_cache = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}"
+
+
 class HealthStatus(Enum):
     """Health check status values."""
     HEALTHY = "healthy"
@@ -40,7 +69,7 @@ class HealthCheckResult:
     status: HealthStatus
     message: str = ""
     duration_ms: float = 0.0
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: str = field(default_factory=_fast_iso_now)
     details: Dict[str, Any] = field(default_factory=dict)
 
 
@@ -71,7 +100,8 @@ class HealthChecker:
 
     def run_check(self, name: str) -> HealthCheckResult:
         """Run a specific health check."""
-        if name not in self.checks:
+        check_fn = self.checks.get(name)
+        if check_fn is None:
             return HealthCheckResult(
                 name=name,
                 status=HealthStatus.UNKNOWN,
@@ -80,42 +110,44 @@ class HealthChecker:
 
         start = time.perf_counter()
         try:
-            result = self.checks[name]()
-            result.duration_ms = (time.perf_counter() - start) * 1000
-            self.last_results[name] = result
-            return result
+            result = check_fn()
         except Exception as e:
             result = HealthCheckResult(
                 name=name,
                 status=HealthStatus.UNHEALTHY,
-                message=str(e),
-                duration_ms=(time.perf_counter() - start) * 1000
+                message=str(e)
             )
-            self.last_results[name] = result
-            return result
+        result.duration_ms = (time.perf_counter() - start) * 1000
+        self.last_results[name] = result
+        return result
 
     def run_all_checks(self) -> Dict[str, HealthCheckResult]:
         """Run all registered health checks."""
-        results = {}
-        for name in self.checks:
-            results[name] = self.run_check(name)
-        return results
+        # Snapshot the names so a check that registers another can't break iteration
+        return {name: self.run_check(name) for name in tuple(self.checks)}
 
     def get_overall_status(self) -> HealthStatus:
         """Get overall health status based on all checks."""
         if not self.last_results:
             return HealthStatus.UNKNOWN
 
-        statuses = [r.status for r in self.last_results.values()]
-
-        if any(s == HealthStatus.UNHEALTHY for s in statuses):
-            return HealthStatus.UNHEALTHY
-        if any(s == HealthStatus.DEGRADED for s in statuses):
+        # Single pass: UNHEALTHY wins outright, then DEGRADED, then any
+        # non-HEALTHY status makes the overall result UNKNOWN
+        degraded = unknown = False
+        for result in self.last_results.values():
+            status = result.status
+            if status is HealthStatus.UNHEALTHY:
+                return HealthStatus.UNHEALTHY
+            if status is HealthStatus.DEGRADED:
+                degraded = True
+            elif status is not HealthStatus.HEALTHY:
+                unknown = True
+
+        if degraded:
             return HealthStatus.DEGRADED
-        if all(s == HealthStatus.HEALTHY for s in statuses):
-            return HealthStatus.HEALTHY
-
-        return HealthStatus.UNKNOWN
+        if unknown:
+            return HealthStatus.UNKNOWN
+        return HealthStatus.HEALTHY
 
     def get_uptime(self) -> timedelta:
         """Get application uptime."""
@@ -144,37 +176,36 @@ class ErrorTracker:
     """Tracks and aggregates errors."""
 
     def __init__(self, max_errors: int = 1000):
-        self.errors: List[Dict[str, Any]] = []
-        self.error_counts: Dict[str, int] = {}
+        # Bounded: appending past max_errors drops the oldest entry in O(1)
+        self.errors: Deque[Dict[str, Any]] = deque(maxlen=max_errors)
+        self.error_counts: Dict[str, int] = Counter()
         self.max_errors = max_errors
+        # Guards error_counts; deque.append is already atomic
         self._lock = threading.Lock()
 
     def record_error(self, error_type: str, message: str,
                      context: Optional[Dict[str, Any]] = None) -> None:
         """Record an error occurrence."""
-        with self._lock:
-            error_entry = {
-                "type": error_type,
-                "message": message,
-                "context": context or {},
-                "timestamp": datetime.now().isoformat()
-            }
-
-            self.errors.append(error_entry)
-            if len(self.errors) > self.max_errors:
-                self.errors.pop(0)
+        error_entry = {
+            "type": error_type,
+            "message": message,
+            "context": context or {},
+            "timestamp": _fast_iso_now()
+        }
+        self.errors.append(error_entry)
 
-            self.error_counts[error_type] = self.error_counts.get(error_type, 0) + 1
+        with self._lock:
+            self.error_counts[error_type] += 1
 
-            # Update telemetry if available
-            collector = get_collector()
-            if collector:
-                collector.increment_counter(f"errors.{error_type}")
+        # Update telemetry if available (outside our lock; it takes its own)
+        collector = get_collector()
+        if collector:
+            collector.increment_counter(f"errors.{error_type}")
 
     def get_recent_errors(self, count: int = 10) -> List[Dict[str, Any]]:
         """Get most recent errors."""
-        with self._lock:
-            return self.errors[-count:]
+        snapshot = list(self.errors)  # atomic copy, safe against concurrent appends
+        return snapshot[len(snapshot) - count:] if count > 0 else []
 
     def get_error_summary(self) -> Dict[str, int]:
         """Get error count by type."""
@@ -191,13 +222,22 @@ class ErrorTracker:
 class PerformanceMonitor:
     """Monitors application performance."""
 
+    # Disk usage changes slowly, so it is re-read only every N metric reads
+    disk_refresh_samples = 10
+
     def __init__(self, sample_interval: float = 60.0):
         self.sample_interval = sample_interval
-        self.samples: List[SystemMetrics] = []
         self.max_samples = 1440  # 24 hours at 1-minute intervals
+        self.samples: Deque[SystemMetrics] = deque(maxlen=self.max_samples)
         self._running = False
+        self._stop = threading.Event()
         self._thread: Optional[threading.Thread] = None
         self._start_time = datetime.now()
+        self._process: Any = None  # psutil.Process, created on first use
+        self._disk_percent: Optional[float] = None
+        self._disk_reads = 0
+        # minutes -> (sample-window key, averaged metrics)
+        self._average_cache: Dict[float, Tuple[Tuple[int, int], SystemMetrics]] = {}
 
     def get_system_metrics(self) -> SystemMetrics:
         """Get current system metrics."""
@@ -213,17 +253,31 @@ class PerformanceMonitor:
             # Try to get process info (requires psutil, fallback gracefully)
             try:
                 import psutil
-                process = psutil.Process()
-
-                metrics.cpu_percent = process.cpu_percent()
-                mem_info = process.memory_info()
-                metrics.memory_used_mb = mem_info.rss / (1024 * 1024)
-                metrics.memory_percent = process.memory_percent()
-                metrics.open_files = len(process.open_files())
+                # Reused across samples: cpu_percent() measures since the
+                # previous call on the same Process, so a fresh one reads 0.0
+                if self._process is None:
+                    self._process = psutil.Process()
+
+                # One batched read of the process fields (psutil oneshot)
+                info = self._process.as_dict(
+                    attrs=["cpu_percent", "memory_info", "memory_percent", "open_files"],
+                    ad_value=None
+                )
+                if info["cpu_percent"] is not None:
+                    metrics.cpu_percent = info["cpu_percent"]
+                if info["memory_info"] is not None:
+                    metrics.memory_used_mb = info["memory_info"].rss / (1024 * 1024)
+                if info["memory_percent"] is not None:
+                    metrics.memory_percent = info["memory_percent"]
+                if info["open_files"] is not None:
+                    metrics.open_files = len(info["open_files"])
 
                 # Disk usage
-                disk = psutil.disk_usage('/')
-                metrics.disk_percent = disk.percent
+                if self._disk_percent is None or self._disk_reads >= self.disk_refresh_samples:
+                    self._disk_percent = psutil.disk_usage('/').percent
+                    self._disk_reads = 0
+                self._disk_reads += 1
+                metrics.disk_percent = self._disk_percent
             except ImportError:
                 # psutil not available, use basic metrics
                 pass
@@ -240,9 +294,6 @@ class PerformanceMonitor:
         metrics = self.get_system_metrics()
         self.samples.append(metrics)
 
-        if len(self.samples) > self.max_samples:
-            self.samples.pop(0)
-
         # Update telemetry
         collector = get_collector()
         if collector:
@@ -259,38 +310,68 @@ class PerformanceMonitor:
             return
 
         self._running = True
+        self._stop.clear()
         self._thread = threading.Thread(target=self._sample_loop, daemon=True)
         self._thread.start()
 
     def stop_background_sampling(self) -> None:
         """Stop background sampling."""
         self._running = False
+        self._stop.set()  # wakes the loop immediately instead of after sample_interval
         if self._thread:
             self._thread.join(timeout=5)
 
     def _sample_loop(self) -> None:
         """Background sampling loop."""
-        while self._running:
+        # Samples are scheduled against a monotonic deadline so the time
+        # spent in sample() doesn't make the cadence drift
+        deadline = time.monotonic()
+        while not self._stop.is_set():
             self.sample()
-            time.sleep(self.sample_interval)
+            deadline += self.sample_interval
+            now = time.monotonic()
+            if deadline < now:
+                deadline = now  # fell behind; don't burst to catch up
+            self._stop.wait(deadline - now)
 
     def get_average_metrics(self, minutes: int = 5) -> SystemMetrics:
         """Get average metrics over the last N minutes."""
-        samples_needed = int(minutes * 60 / self.sample_interval)
-        recent = self.samples[-samples_needed:] if self.samples else []
+        # At least one sample, even for windows shorter than the interval
+        samples_needed = max(1, int(minutes * 60 / self.sample_interval))
+        recent = list(islice(self.samples, max(0, len(self.samples) - samples_needed), None))
 
         if not recent:
             return SystemMetrics()
 
-        return SystemMetrics(
-            cpu_percent=sum(s.cpu_percent for s in recent) / len(recent),
-            memory_percent=sum(s.memory_percent for s in recent) / len(recent),
-            memory_used_mb=sum(s.memory_used_mb for s in recent) / len(recent),
-            disk_percent=sum(s.disk_percent for s in recent) / len(recent),
-            open_files=int(sum(s.open_files for s in recent) / len(recent)),
-            thread_count=int(sum(s.thread_count for s in recent) / len(recent)),
-            uptime_seconds=recent[-1].uptime_seconds if recent else 0
+        # Averages only change when a sample is taken, but /metrics may be
+        # scraped far more often than sample_interval
+        window_key = (len(self.samples), id(self.samples[-1]))
+        cached = self._average_cache.get(minutes)
+        if cached is not None and cached[0] == window_key:
+            return replace(cached[1])
+
+        # Single pass over the window, accumulating every field at once
+        cpu = mem_pct = mem_mb = disk = files = threads = 0.0
+        for s in recent:
+            cpu += s.cpu_percent
+            mem_pct += s.memory_percent
+            mem_mb += s.memory_used_mb
+            disk += s.disk_percent
+            files += s.open_files
+            threads += s.thread_count
+        n = len(recent)
+
+        average = SystemMetrics(
+            cpu_percent=cpu / n,
+            memory_percent=mem_pct / n,
+            memory_used_mb=mem_mb / n,
+            disk_percent=disk / n,
+            open_files=int(files / n),
+            thread_count=int(threads / n),
+            uptime_seconds=recent[-1].uptime_seconds
         )
+        self._average_cache[minutes] = (window_key, average)
+        return replace(average)
 
 
 class MonitoringService:
@@ -397,13 +478,23 @@ class MonitoringService:
             "recent_errors": self.error_tracker.get_recent_errors(5)
         }
 
-    def export_json(self) -> str:
-        """Export full monitoring status as JSON."""
-        return json.dumps({
+    def export_json(self, indent: bool = True) -> str:
+        """
+        Export full monitoring status as JSON.
+
+        Pass indent=False for compact output on machine-scraped endpoints.
+        """
+        payload = {
             "health": self.get_health(),
             "metrics": self.get_metrics(),
             "timestamp": datetime.now().isoformat()
-        }, indent=2)
+        }
+        if ORJSON_AVAILABLE:
+            try:
+                return orjson.dumps(payload, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+            except TypeError:
+                pass  # e.g. integers beyond 64 bits in error context
+        return json.dumps(payload, indent=2 if indent else None)
 
 
 # Global monitoring service
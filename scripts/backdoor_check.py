@@ -10,11 +10,23 @@ Scans the codebase for suspicious patterns that might indicate:
 - Hidden execution paths
 """
 
+import argparse
+import hashlib
+import json
 import os
 import re
 import sys
-from dataclasses import dataclass
-from typing import List, Tuple
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Optional: RE2 matches every pattern in one linear-time pass per line
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
 
 
 @dataclass
@@ -30,8 +42,10 @@ class Finding:
 class BackdoorChecker:
     """Scans codebase for backdoor indicators."""
 
-    # Patterns that might indicate backdoors or security issues
-    PATTERNS = {
+    # Patterns that might indicate backdoors or security issues. Gaps between
+    # keywords are bounded ({0,200}?) rather than .* so that a long line full
+    # of near-misses can't make the search backtrack polynomially.
+    _RAW_PATTERNS = {
         # Hardcoded credentials
         "hardcoded_password": (
             r'(password|passwd|pwd)\s*=\s*["\'][^"\']+["\']',
@@ -78,14 +92,14 @@ class BackdoorChecker:
             "Binding to all interfaces"
         ),
         "reverse_shell": (
-            r'(socket\.socket|subprocess).*connect.*shell|/bin/(ba)?sh',
+            r'(socket\.socket|subprocess).{0,200}?connect.{0,200}?shell|/bin/(ba)?sh',
             "CRITICAL",
             "Possible reverse shell pattern"
         ),
 
         # File operations
         "world_writable": (
-            r'chmod.*0?777',
+            r'chmod.{0,200}?777',
             "MEDIUM",
             "World-writable permissions"
         ),
@@ -97,7 +111,7 @@ class BackdoorChecker:
 
         # Obfuscation
         "base64_decode_exec": (
-            r'base64.*decode.*exec|exec.*base64.*decode',
+            r'base64.{0,200}?decode.{0,200}?exec|exec.{0,200}?base64.{0,200}?decode',
             "CRITICAL",
             "Base64 decode followed by exec"
         ),
@@ -107,14 +121,14 @@ class BackdoorChecker:
             "Hex decoding (verify usage)"
         ),
         "rot13": (
-            r'codecs\.(encode|decode).*rot',
+            r'codecs\.(encode|decode).{0,200}?rot',
             "MEDIUM",
             "ROT13 encoding (possible obfuscation)"
         ),
 
         # Hidden execution
         "subprocess_shell": (
-            r'subprocess\.(call|run|Popen).*shell\s*=\s*True',
+            r'subprocess\.(call|run|Popen).{0,200}?shell\s*=\s*True',
             "MEDIUM",
             "Shell execution via subprocess"
         ),
@@ -157,67 +171,258 @@ class BackdoorChecker:
             "Debug mode enabled"
         ),
         "todo_security": (
-            r'#\s*TODO.*security|#\s*FIXME.*security',
+            r'#\s*(TODO|FIXME).{0,200}?security',
             "LOW",
             "Security-related TODO/FIXME"
         ),
     }
 
+    # Compiled once at class load so the scan loop skips re's cache lookup
+    PATTERNS = {
+        name: (re.compile(pattern, re.IGNORECASE), severity, desc)
+        for name, (pattern, severity, desc) in _RAW_PATTERNS.items()
+    }
+
+    # Finding.pattern_name per pattern, built once and shared by all findings
+    FINDING_LABELS = {
+        name: f"{name}: {desc}"
+        for name, (_, _, desc) in _RAW_PATTERNS.items()
+    }
+
+    # Every pattern fused into one alternation. Most lines match nothing, so
+    # a single search rules them out; lines that do match are rechecked per
+    # pattern, since alternation only reports one overlapping match.
+    ANY_PATTERN = re.compile(
+        "|".join(f"(?:{pattern})" for pattern, _, _ in _RAW_PATTERNS.values()),
+        re.IGNORECASE
+    )
+
+    # Lowercase substrings of which every pattern needs at least one, so a
+    # line containing none of them can't match and skips the regex engine
+    PREFILTER_LITERALS = (
+        'passw', 'pwd', 'key', 'token', 'bearer', 'eval', 'exec', 'compile',
+        '__import__', '.bind', 'connect', '/bin/', 'chmod', '/etc/', 'base64',
+        'fromhex', 'unhexlify', 'codecs.', 'subprocess.', 'os.system',
+        'os.popen', 'os.environ[', 'pickle.', 'http', 'debug', 'todo', 'fixme',
+    )
+    # One case-sensitive literal alternation over the lowercased line is
+    # cheaper than a Python-level loop of substring tests
+    PREFILTER = re.compile("|".join(map(re.escape, PREFILTER_LITERALS)))
+
     # Files/directories to skip
     SKIP_DIRS = {'.git', '__pycache__', 'venv', 'env', '.venv', 'node_modules'}
     SKIP_FILES = {'.pyc', '.pyo', '.so', '.dll', '.exe'}
+    SKIP_SUFFIXES = tuple(SKIP_FILES)
+
+    # Below this many files, worker start-up costs more than it saves
+    PARALLEL_MIN_FILES = 200
 
-    def __init__(self, root_path: str):
+    def __init__(self, root_path: str, jobs: Optional[int] = None,
+                 cache_path: Optional[str] = None):
         self.root_path = root_path
+        self.jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+        self.cache_path = cache_path
         self.findings: List[Finding] = []
 
     def scan(self) -> List[Finding]:
-        """Scan the codebase for suspicious patterns."""
-        self.findings = []
+        """Scan the codebase for suspicious patterns.
 
-        for root, dirs, files in os.walk(self.root_path):
-            # Skip excluded directories
-            dirs[:] = [d for d in dirs if d not in self.SKIP_DIRS]
+        Large trees are split across worker processes; findings come back
+        in the same order as a serial scan. With a cache_path, files whose
+        mtime and size match the previous run reuse its findings.
+        """
+        self.findings = []
 
-            for filename in files:
-                # Skip binary files
-                if any(filename.endswith(ext) for ext in self.SKIP_FILES):
+        entries = list(self._iter_files(self.root_path))
+        cache = self._load_cache()
+        new_cache: Dict[str, List[Any]] = {}
+        reused: Dict[str, List[Finding]] = {}
+        file_paths = []
+        for entry in entries:
+            if self.cache_path:
+                try:
+                    stat = entry.stat()
+                except OSError:
                     continue
-
-                # Only scan Python files and scripts
-                if not (filename.endswith('.py') or filename.endswith('.sh')):
+                key = [stat.st_mtime_ns, stat.st_size]
+                cached = cache.get(entry.path)
+                if cached is not None and cached[:2] == key:
+                    reused[entry.path] = [Finding(**f) for f in cached[2]]
+                    new_cache[entry.path] = cached
+                    continue
+                new_cache[entry.path] = key
+            file_paths.append(entry.path)
+
+        if self.jobs > 1 and len(file_paths) >= self.PARALLEL_MIN_FILES:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                scanned = dict(zip(file_paths, executor.map(
+                    _scan_file_worker, file_paths, chunksize=32
+                )))
+        else:
+            scanned = {path: self._scan_file(path) for path in file_paths}
+
+        for entry in entries:
+            findings = reused.get(entry.path)
+            if findings is None:
+                findings = scanned.get(entry.path)
+                if findings is None:
+                    # Unreadable: report nothing and don't cache it
+                    new_cache.pop(entry.path, None)
                     continue
+                if self.cache_path:
+                    new_cache[entry.path] = new_cache[entry.path] + [
+                        [asdict(f) for f in findings]
+                    ]
+            self.findings.extend(findings)
 
-                file_path = os.path.join(root, filename)
-                self._scan_file(file_path)
+        if self.cache_path:
+            self._save_cache(new_cache)
 
         return self.findings
 
-    def _scan_file(self, file_path: str) -> None:
-        """Scan a single file for suspicious patterns."""
+    def _cache_signature(self) -> str:
+        """Hash of this script, so editing patterns or filters drops the cache."""
+        with open(os.path.abspath(__file__), 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def _load_cache(self) -> Dict[str, List[Any]]:
+        """Load per-file [mtime_ns, size, findings] entries from cache_path."""
+        if not self.cache_path:
+            return {}
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-        except Exception:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('signature') != self._cache_signature():
+            return {}
+        files = data.get('files')
+        if not isinstance(files, dict):
+            return {}
+        return files
+
+    def _save_cache(self, files: Dict[str, List[Any]]) -> None:
+        """Write the cache to a temporary file and rename it into place.
+
+        The temporary file gets a unique name, so concurrent scans sharing a
+        cache never write into each other's half-finished file.
+        """
+        cache_path = self.cache_path
+        if not cache_path:
             return
-
-        for line_num, line in enumerate(lines, 1):
-            for pattern_name, (pattern, severity, desc) in self.PATTERNS.items():
-                if re.search(pattern, line, re.IGNORECASE):
-                    # Filter out false positives in test files and comments
-                    if self._is_false_positive(file_path, line, pattern_name):
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(cache_path)),
+                prefix=f"{os.path.basename(cache_path)}.", suffix=".tmp"
+            )
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'signature': self._cache_signature(), 'files': files}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            os.unlink(tmp_path)
+
+    def _iter_files(self, root_path: str) -> Iterator[os.DirEntry]:
+        """Yield entries for scannable files under root_path in os.walk order.
+
+        Uses os.scandir so directory entries are classified from the cached
+        dirent type instead of a separate stat per file.
+        """
+        pending = [root_path]
+        while pending:
+            directory = pending.pop()
+            subdirs = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+
+                        if is_dir:
+                            # Skip excluded directories; like os.walk, don't
+                            # descend into symlinked ones
+                            if name not in self.SKIP_DIRS and not entry.is_symlink():
+                                subdirs.append(entry.path)
+                            continue
+
+                        # Skip binary files
+                        if name.endswith(self.SKIP_SUFFIXES):
+                            continue
+
+                        # Only scan Python files and scripts
+                        if name.endswith(('.py', '.sh')):
+                            yield entry
+            except OSError:
+                continue
+
+            pending.extend(reversed(subdirs))
+
+    def _scan_file(self, file_path: str) -> Optional[List[Finding]]:
+        """Scan a single file for suspicious patterns.
+
+        Lines are streamed rather than read up front, so memory stays at one
+        line. Returns the file's findings, or None if it can't be read.
+        """
+        if self._is_skipped_file(file_path):
+            return []
+
+        findings = []
+        prefilter = self.PREFILTER.search
+        any_pattern = self.ANY_PATTERN.search
+        pattern_set = _pattern_set()
+        pattern_table = list(self.PATTERNS.items())
+        labels = self.FINDING_LABELS
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line_num, line in enumerate(f, 1):
+                    # Non-ASCII lines skip the literal check: re.IGNORECASE
+                    # matches 'i' against dotless/dotted I, which lower()
+                    # doesn't fold
+                    if line.isascii() and prefilter(line.lower()) is None:
                         continue
+                    # Documentation strings are false positives
+                    if '"""' in line or "'''" in line:
+                        continue
+                    # So are comments explaining security measures, except
+                    # for the security TODO pattern, which looks for comments
+                    is_comment = line.lstrip().startswith('#')
+
+                    if pattern_set is not None:
+                        matched = pattern_set.Match(line)
+                        if not matched:
+                            continue
+                        hits = [pattern_table[index] for index in sorted(matched)]
+                    else:
+                        if any_pattern(line) is None:
+                            continue
+                        hits = pattern_table
+
+                    # RE2 hits are confirmed with re too: the engines differ
+                    # on \b, \d and $ before a newline, and findings must not
+                    # depend on whether google-re2 is installed
+                    for pattern_name, (pattern, severity, desc) in hits:
+                        if is_comment and pattern_name != 'todo_security':
+                            continue
+                        if pattern.search(line):
+                            findings.append(Finding(
+                                file_path=file_path,
+                                line_number=line_num,
+                                line_content=line.strip()[:100],
+                                pattern_name=labels[pattern_name],
+                                severity=severity
+                            ))
+        except Exception:
+            return None
 
-                    self.findings.append(Finding(
-                        file_path=file_path,
-                        line_number=line_num,
-                        line_content=line.strip()[:100],
-                        pattern_name=f"{pattern_name}: {desc}",
-                        severity=severity
-                    ))
+        return findings
 
-    def _is_false_positive(self, file_path: str, line: str, pattern_name: str) -> bool:
-        """Check if a finding is likely a false positive."""
+    def _is_skipped_file(self, file_path: str) -> bool:
+        """Check if every finding in a file would be a false positive."""
         # Test files are expected to contain attack patterns
         if 'test_' in file_path or '_test.py' in file_path:
             return True
@@ -226,14 +431,6 @@ class BackdoorChecker:
         if 'backdoor_check.py' in file_path:
             return True
 
-        # Comments explaining security measures
-        if line.strip().startswith('#') and pattern_name not in ['todo_security']:
-            return True
-
-        # Documentation strings
-        if '"""' in line or "'''" in line:
-            return True
-
         return False
 
     def print_report(self) -> int:
@@ -285,15 +482,48 @@ class BackdoorChecker:
             return 0
 
 
+_re2_pattern_set: Optional[Any] = None
+
+
+def _pattern_set() -> Optional[Any]:
+    """Return an RE2 set of all patterns in table order, or None without RE2.
+
+    Built once per process. Set indices follow BackdoorChecker.PATTERNS.
+    """
+    global _re2_pattern_set
+    if not RE2_AVAILABLE:
+        return None
+    if _re2_pattern_set is None:
+        options = re2.Options()
+        options.case_sensitive = False
+        pattern_set = re2.Set.SearchSet(options)
+        for pattern, _, _ in BackdoorChecker._RAW_PATTERNS.values():
+            pattern_set.Add(pattern)
+        pattern_set.Compile()
+        _re2_pattern_set = pattern_set
+    return _re2_pattern_set
+
+
+def _scan_file_worker(file_path: str) -> Optional[List[Finding]]:
+    """Scan one file in a worker process and return its findings."""
+    return BackdoorChecker(os.path.dirname(file_path), jobs=1)._scan_file(file_path)
+
+
 def main():
     """Run the backdoor checker."""
-    # Default to current directory or first argument
-    root_path = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
+    parser = argparse.ArgumentParser(description="Scan for backdoor indicators")
+    # Default to current directory
+    parser.add_argument("root", nargs="?", default=os.getcwd(),
+                        help="Directory to scan")
+    parser.add_argument("--cache", metavar="FILE",
+                        help="Reuse findings for files unchanged since the last run")
+    args = parser.parse_args()
+    root_path = args.root
 
     print(f"Scanning: {root_path}")
     print()
 
-    checker = BackdoorChecker(root_path)
+    checker = BackdoorChecker(root_path, cache_path=args.cache)
     findings = checker.scan()
     exit_code = checker.print_report()
 
@@ -8,25 +8,63 @@ usage patterns, and error tracking.
 
 import json
 import os
+import sys
 import threading
 import time
-from collections import defaultdict
+from array import array
+from collections import defaultdict, deque
 from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Callable, Dict, List, Optional
+from functools import partial
+from types import MappingProxyType
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Tuple
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-@dataclass
+# Per-event records drop their instance __dict__ where dataclasses support it
+_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(init=False, **_SLOTS)
 class MetricPoint:
-    """A single metric measurement."""
+    """A single metric measurement.
+
+    The record time is kept as timestamp_ns; timestamp formats it on
+    demand. A timestamp ISO string is still accepted when constructing.
+    """
     name: str
     value: float
-    timestamp: str
+    timestamp_ns: int  # time.time_ns() at record time
     labels: Dict[str, str] = field(default_factory=dict)
     metric_type: str = "gauge"  # gauge, counter, histogram
 
-
-@dataclass
+    def __init__(self, name: str, value: float, timestamp: Optional[str] = None,
+                 labels: Optional[Dict[str, str]] = None, metric_type: str = "gauge",
+                 *, timestamp_ns: Optional[int] = None):
+        if timestamp_ns is None:
+            if timestamp is None:
+                timestamp_ns = time.time_ns()
+            else:
+                parsed = datetime.fromisoformat(timestamp)
+                timestamp_ns = int(parsed.timestamp()) * 1_000_000_000 + parsed.microsecond * 1000
+        self.name = name
+        self.value = value
+        self.timestamp_ns = timestamp_ns
+        self.labels = {} if labels is None else labels
+        self.metric_type = metric_type
+
+    @property
+    def timestamp(self) -> str:
+        """Record time as a local ISO 8601 string, formatted on demand."""
+        seconds, nanos = divmod(self.timestamp_ns, 1_000_000_000)
+        return datetime.fromtimestamp(seconds).replace(microsecond=nanos // 1000).isoformat()
+
+
+@dataclass(**_SLOTS)
 class WorkflowMetrics:
     """Metrics for a workflow execution."""
     workflow_id: str
@@ -42,59 +80,156 @@ class WorkflowMetrics:
     total_tokens: int = 0
     errors: List[str] = field(default_factory=list)
     status: str = "running"
+    start_monotonic: float = field(default=0.0, repr=False, compare=False)
 
 
-class MetricsCollector:
-    """Collects and aggregates metrics."""
+# Metric name -> Prometheus-safe name, shared by every export
+_prometheus_names: Dict[str, str] = {}
 
-    def __init__(self, app_name: str = "code_cobra"):
+
+def _prometheus_name(name: str) -> str:
+    """Return name with '.' and '-' replaced by '_', memoized across scrapes."""
+    safe_name = _prometheus_names.get(name)
+    if safe_name is None:
+        safe_name = _prometheus_names[name] = name.replace(".", "_").replace("-", "_")
+    return safe_name
+
+
+class MetricsCollector:
+    """Collects and aggregates metrics.
+
+    Every recorded value also lands in a per-metric audit trail of
+    MetricPoints, bounded to the most recent max_points entries
+    (0 disables the trail). Histogram values are kept as packed
+    doubles for exact percentiles.
+
+    With the trail disabled, counters are sharded per thread: each thread
+    increments its own dict without taking the lock. Increments that
+    record a point go to a shared dict under the lock, since the point
+    needs the running total. Shards of exited threads are folded into the
+    shared dict. counters and counter_totals() read the summed totals;
+    counters change only through increment_counter().
+    """
+
+    def __init__(self, app_name: str = "code_cobra", max_points: int = 1000):
         self.app_name = app_name
-        self.metrics: Dict[str, List[MetricPoint]] = defaultdict(list)
-        self.counters: Dict[str, float] = defaultdict(float)
+        self.max_points = max_points
+        self.metrics: Dict[str, Deque[MetricPoint]] = defaultdict(
+            partial(deque, maxlen=max_points)
+        )
+        self._counters: Dict[str, float] = defaultdict(float)
+        # (owning thread, shard) for each thread that incremented lock-free
+        self._counter_shards: List[Tuple[threading.Thread, Dict[str, float]]] = []
+        self._local = threading.local()
         self.gauges: Dict[str, float] = {}
-        self.histograms: Dict[str, List[float]] = defaultdict(list)
+        self.histograms: Dict[str, "array[float]"] = defaultdict(lambda: array("d"))
         self.workflows: Dict[str, WorkflowMetrics] = {}
+        self._sorted_histograms: Dict[str, List[float]] = {}
         self._lock = threading.Lock()
         self._start_time = datetime.now()
 
-    def record_gauge(self, name: str, value: float,
-                     labels: Optional[Dict[str, str]] = None) -> None:
-        """Record a gauge metric (current value)."""
+    @property
+    def counters(self) -> Mapping[str, float]:
+        """Read-only view of counter totals; missing counters read as 0.0."""
+        return MappingProxyType(defaultdict(float, self.counter_totals()))
+
+    def counter_totals(self) -> Dict[str, float]:
+        """Snapshot of counter totals, summed across all threads' shards."""
         with self._lock:
-            self.gauges[name] = value
+            return self._counter_totals()
+
+    def _counter_totals(self) -> Dict[str, float]:
+        """Sum counters across shards. Caller holds the lock."""
+        self._retire_dead_shards()
+        totals = dict(self._counters)
+        for _, shard in self._counter_shards:
+            for name, value in shard.copy().items():
+                totals[name] = totals.get(name, 0.0) + value
+        return totals
+
+    def _counter_shard(self) -> Dict[str, float]:
+        """Return the calling thread's counter shard, creating it on first use."""
+        try:
+            shard: Dict[str, float] = self._local.counters
+        except AttributeError:
+            shard = self._local.counters = defaultdict(float)
+            with self._lock:
+                self._retire_dead_shards()
+                self._counter_shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_dead_shards(self) -> None:
+        """Fold shards of exited threads into the shared counters. Caller holds the lock."""
+        live = []
+        for thread, shard in self._counter_shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                for name, value in shard.items():
+                    self._counters[name] += value
+        self._counter_shards = live
+
+    def _counter_total(self, name: str) -> float:
+        """Sum one counter across shards. Caller holds the lock."""
+        return self._counters.get(name, 0.0) + sum(
+            shard.get(name, 0.0) for _, shard in self._counter_shards
+        )
+
+    def _add_point(self, name: str, value: float,
+                   labels: Optional[Dict[str, str]], metric_type: str) -> None:
+        """Append to a metric's audit trail. Caller holds the lock."""
+        if self.max_points:
+            # Interned so points for names built per call (f"errors.{...}",
+            # f"workflows_{status}") share one string
+            name = sys.intern(name)
             self.metrics[name].append(MetricPoint(
                 name=name,
                 value=value,
-                timestamp=datetime.now().isoformat(),
+                timestamp_ns=time.time_ns(),
                 labels=labels or {},
-                metric_type="gauge"
+                metric_type=metric_type
             ))
 
+    def _increment_counter(self, name: str, value: float,
+                           labels: Optional[Dict[str, str]]) -> None:
+        """Increment a counter. Caller holds the lock."""
+        counters = self._counters
+        counters[name] += value
+        if self.max_points:
+            # Thread shards only exist if the trail was ever disabled
+            if not self._counter_shards:
+                total = counters[name]
+            else:
+                total = self._counter_total(name)
+            self._add_point(name, total, labels, "counter")
+
+    def _record_histogram(self, name: str, value: float,
+                          labels: Optional[Dict[str, str]]) -> None:
+        """Record a histogram value. Caller holds the lock."""
+        self.histograms[name].append(value)
+        self._add_point(name, value, labels, "histogram")
+
+    def record_gauge(self, name: str, value: float,
+                     labels: Optional[Dict[str, str]] = None) -> None:
+        """Record a gauge metric (current value)."""
+        with self._lock:
+            self.gauges[name] = value
+            self._add_point(name, value, labels, "gauge")
+
     def increment_counter(self, name: str, value: float = 1.0,
                           labels: Optional[Dict[str, str]] = None) -> None:
         """Increment a counter metric."""
+        if not self.max_points:
+            self._counter_shard()[name] += value
+            return
         with self._lock:
-            self.counters[name] += value
-            self.metrics[name].append(MetricPoint(
-                name=name,
-                value=self.counters[name],
-                timestamp=datetime.now().isoformat(),
-                labels=labels or {},
-                metric_type="counter"
-            ))
+            self._increment_counter(name, value, labels)
 
     def record_histogram(self, name: str, value: float,
                          labels: Optional[Dict[str, str]] = None) -> None:
         """Record a histogram value (for distribution analysis)."""
         with self._lock:
-            self.histograms[name].append(value)
-            self.metrics[name].append(MetricPoint(
-                name=name,
-                value=value,
-                timestamp=datetime.now().isoformat(),
-                labels=labels or {},
-                metric_type="histogram"
-            ))
+            self._record_histogram(name, value, labels)
 
     def start_workflow(self, workflow_id: str, total_steps: int) -> None:
         """Start tracking a workflow."""
@@ -102,9 +237,10 @@ class MetricsCollector:
             self.workflows[workflow_id] = WorkflowMetrics(
                 workflow_id=workflow_id,
                 start_time=datetime.now().isoformat(),
-                total_steps=total_steps
+                total_steps=total_steps,
+                start_monotonic=time.perf_counter()
             )
-            self.increment_counter("workflows_started")
+            self._increment_counter("workflows_started", 1.0, None)
 
     def complete_step(self, workflow_id: str, model_used: str,
                       tokens: int = 0) -> None:
@@ -122,8 +258,8 @@ class MetricsCollector:
                 elif model_used == "model_c":
                     wf.model_c_calls += 1
 
-                self.increment_counter("steps_completed")
-                self.record_histogram("tokens_per_step", tokens)
+                self._increment_counter("steps_completed", 1.0, None)
+                self._record_histogram("tokens_per_step", tokens, None)
 
     def fail_step(self, workflow_id: str, error: str) -> None:
         """Record step failure."""
@@ -133,8 +269,8 @@ class MetricsCollector:
                 wf.failed_steps += 1
                 wf.errors.append(error)
 
-                self.increment_counter("steps_failed")
-                self.increment_counter(f"errors.{error[:50]}")
+                self._increment_counter("steps_failed", 1.0, None)
+                self._increment_counter(f"errors.{error[:50]}", 1.0, None)
 
     def end_workflow(self, workflow_id: str, status: str = "completed") -> None:
         """End workflow tracking."""
@@ -143,18 +279,31 @@ class MetricsCollector:
                 wf = self.workflows[workflow_id]
                 wf.end_time = datetime.now().isoformat()
                 wf.status = status
+                wf.duration_seconds = time.perf_counter() - wf.start_monotonic
 
-                start = datetime.fromisoformat(wf.start_time)
-                end = datetime.fromisoformat(wf.end_time)
-                wf.duration_seconds = (end - start).total_seconds()
-
-                self.increment_counter(f"workflows_{status}")
-                self.record_histogram("workflow_duration", wf.duration_seconds)
+                self._increment_counter(f"workflows_{status}", 1.0, None)
+                self._record_histogram("workflow_duration", wf.duration_seconds, None)
 
     def get_workflow_metrics(self, workflow_id: str) -> Optional[WorkflowMetrics]:
         """Get metrics for a specific workflow."""
         return self.workflows.get(workflow_id)
 
+    def _sorted_histogram(self, name: str) -> List[float]:
+        """Return a histogram's values sorted, reusing the last scrape's sort.
+
+        Values are only ever appended, so the cached sorted prefix plus the
+        new tail forms two runs that sort() merges in linear time.
+        Caller holds the lock.
+        """
+        values = self.histograms[name]
+        cached = self._sorted_histograms.get(name, [])
+        if len(cached) != len(values):
+            merged = list(cached)
+            merged.extend(values[len(cached):])
+            merged.sort()
+            self._sorted_histograms[name] = cached = merged
+        return cached
+
     def get_summary(self) -> Dict[str, Any]:
         """Get summary of all metrics."""
         with self._lock:
@@ -163,11 +312,11 @@ class MetricsCollector:
             histogram_stats = {}
             for name, values in self.histograms.items():
                 if values:
-                    sorted_vals = sorted(values)
+                    sorted_vals = self._sorted_histogram(name)
                     histogram_stats[name] = {
                         "count": len(values),
-                        "min": min(values),
-                        "max": max(values),
+                        "min": sorted_vals[0],
+                        "max": sorted_vals[-1],
                         "mean": sum(values) / len(values),
                         "p50": sorted_vals[len(values) // 2],
                         "p95": sorted_vals[int(len(values) * 0.95)] if len(values) > 1 else sorted_vals[0],
@@ -183,7 +332,7 @@ class MetricsCollector:
                 "app_name": self.app_name,
                 "uptime_seconds": uptime,
                 "timestamp": datetime.now().isoformat(),
-                "counters": dict(self.counters),
+                "counters": self._counter_totals(),
                 "gauges": dict(self.gauges),
                 "histograms": histogram_stats,
                 "active_workflows": active_workflows,
@@ -195,40 +344,47 @@ class MetricsCollector:
         lines = []
         prefix = self.app_name
 
-        # Counters
-        for name, value in self.counters.items():
-            safe_name = name.replace(".", "_").replace("-", "_")
-            lines.append(f"# TYPE {prefix}_{safe_name} counter")
-            lines.append(f"{prefix}_{safe_name} {value}")
-
-        # Gauges
-        for name, value in self.gauges.items():
-            safe_name = name.replace(".", "_").replace("-", "_")
-            lines.append(f"# TYPE {prefix}_{safe_name} gauge")
-            lines.append(f"{prefix}_{safe_name} {value}")
-
-        # Histogram summaries
-        for name, values in self.histograms.items():
-            if values:
-                safe_name = name.replace(".", "_").replace("-", "_")
-                sorted_vals = sorted(values)
-                count = len(values)
-                total = sum(values)
-
-                lines.append(f"# TYPE {prefix}_{safe_name} histogram")
-                lines.append(f'{prefix}_{safe_name}_count {count}')
-                lines.append(f'{prefix}_{safe_name}_sum {total}')
-
-                # Quantiles
-                for q in [0.5, 0.9, 0.95, 0.99]:
-                    idx = int(count * q)
-                    lines.append(f'{prefix}_{safe_name}{{quantile="{q}"}} {sorted_vals[min(idx, count-1)]}')
+        with self._lock:
+            # Counters
+            for name, value in self._counter_totals().items():
+                safe_name = _prometheus_name(name)
+                lines.append(f"# TYPE {prefix}_{safe_name} counter")
+                lines.append(f"{prefix}_{safe_name} {value}")
+
+            # Gauges
+            for name, value in self.gauges.items():
+                safe_name = _prometheus_name(name)
+                lines.append(f"# TYPE {prefix}_{safe_name} gauge")
+                lines.append(f"{prefix}_{safe_name} {value}")
+
+            # Histogram summaries
+            for name, values in self.histograms.items():
+                if values:
+                    safe_name = _prometheus_name(name)
+                    sorted_vals = self._sorted_histogram(name)
+                    count = len(sorted_vals)
+                    total = sum(values)
+
+                    lines.append(f"# TYPE {prefix}_{safe_name} histogram")
+                    lines.append(f'{prefix}_{safe_name}_count {count}')
+                    lines.append(f'{prefix}_{safe_name}_sum {total}')
+
+                    # Quantiles
+                    for q in [0.5, 0.9, 0.95, 0.99]:
+                        idx = int(count * q)
+                        lines.append(f'{prefix}_{safe_name}{{quantile="{q}"}} {sorted_vals[min(idx, count-1)]}')
 
         return "\n".join(lines)
 
     def export_json(self) -> str:
         """Export metrics as JSON."""
-        return json.dumps(self.get_summary(), indent=2)
+        summary = self.get_summary()
+        if ORJSON_AVAILABLE:
+            try:
+                return orjson.dumps(summary, option=orjson.OPT_INDENT_2).decode("utf-8")
+            except TypeError:
+                pass  # e.g. integers beyond 64 bits
+        return json.dumps(summary, indent=2)
 
 
 class Timer:
@@ -0,0 +1,18 @@
+"""
+pytest configuration for Autonomous Coding Ensemble System tests.
+
+Only pytest reads this file; `python -m unittest discover` ignores it.
+"""
+
+import pytest
+
+# Names whose use in a test body means it starts a child interpreter
+_SPAWN_NAMES = frozenset({"subprocess", "cli_help"})
+
+
+def pytest_collection_modifyitems(items):
+    """Mark tests that spawn a process so `-m "not spawn"` can skip them."""
+    for item in items:
+        code = getattr(getattr(item, "obj", None), "__code__", None)
+        if code is not None and _SPAWN_NAMES.intersection(code.co_names):
+            item.add_marker(pytest.mark.spawn)
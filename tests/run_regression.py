@@ -9,10 +9,18 @@ Use this before releases to ensure no regressions.
 import json
 import os
 import sys
+import time
 import unittest
+from collections import Counter
 from datetime import datetime
 from typing import Dict, List, Any
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -23,11 +31,14 @@ class RegressionTestResult(unittest.TestResult):
     def __init__(self):
         super().__init__()
         self.test_results: List[Dict[str, Any]] = []
+        self.status_counts: Counter = Counter()
+        # Wall clock for the report timestamp; durations use perf_counter
         self.start_time: datetime = datetime.now()
+        self._run_start = time.perf_counter()
 
     def startTest(self, test: unittest.TestCase) -> None:
         super().startTest(test)
-        self._test_start = datetime.now()
+        self._test_start = time.perf_counter()
 
     def addSuccess(self, test: unittest.TestCase) -> None:
         super().addSuccess(test)
@@ -52,7 +63,7 @@ class RegressionTestResult(unittest.TestResult):
         err=None,
         reason: str = None
     ) -> None:
-        duration = (datetime.now() - self._test_start).total_seconds()
+        duration = time.perf_counter() - self._test_start
         result = {
             "name": str(test),
             "class": test.__class__.__name__,
@@ -65,14 +76,15 @@ class RegressionTestResult(unittest.TestResult):
         if reason:
             result["skip_reason"] = reason
         self.test_results.append(result)
+        self.status_counts[status] += 1
 
     def get_summary(self) -> Dict[str, Any]:
         """Get test run summary."""
-        total_duration = (datetime.now() - self.start_time).total_seconds()
+        total_duration = time.perf_counter() - self._run_start
         return {
             "timestamp": self.start_time.isoformat(),
             "total_tests": self.testsRun,
-            "passed": len([r for r in self.test_results if r["status"] == "passed"]),
+            "passed": self.status_counts["passed"],
             "failed": len(self.failures),
             "errors": len(self.errors),
             "skipped": len(self.skipped),
@@ -159,8 +171,12 @@ def run_regression_tests(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
             report_file
         )
-        with open(report_path, "w") as f:
-            json.dump(report, f, indent=2, default=str)
+        if ORJSON_AVAILABLE:
+            with open(report_path, "wb") as f:
+                f.write(orjson.dumps(report, default=str, option=orjson.OPT_INDENT_2))
+        else:
+            with open(report_path, "w") as f:
+                json.dump(report, f, indent=2, default=str)
         print(f"Report saved: {report_path}")
 
     return summary["success"]
@@ -6,6 +6,8 @@ These tests verify end-to-end user scenarios and acceptance criteria
 from the user stories defined in docs/USER_STORIES.md.
 """
 
+import contextlib
+import io
 import json
 import os
 import subprocess
@@ -15,7 +17,34 @@ import unittest
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from autonomous_ensemble import Config
+from autonomous_ensemble import Config, main
+
+
+_cli_help_output = None
+
+
+def cli_help() -> str:
+    """Return `autonomous_ensemble.py --help` output, run once per session."""
+    global _cli_help_output
+    if _cli_help_output is None:
+        result = subprocess.run(
+            [sys.executable, "autonomous_ensemble.py", "--help"],
+            capture_output=True,
+            text=True
+        )
+        _cli_help_output = result.stdout
+    return _cli_help_output
+
+
+def run_main(*argv: str):
+    """Run the CLI entry point in-process; return (exit code, stdout)."""
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        try:
+            returncode = main(list(argv))
+        except SystemExit as e:  # argparse exits for --help and usage errors
+            returncode = e.code
+    return returncode, stdout.getvalue()
 
 
 class TestUS11_GenerateCodeFromSpec(unittest.TestCase):
@@ -28,12 +57,7 @@ class TestUS11_GenerateCodeFromSpec(unittest.TestCase):
 
     def test_accepts_spec_via_flag(self):
         """System accepts specification via --spec flag."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--help"],
-            capture_output=True,
-            text=True
-        )
-        self.assertIn("--spec", result.stdout)
+        self.assertIn("--spec", cli_help())
 
     def test_accepts_spec_as_file_path(self):
         """System accepts specification as file path."""
@@ -69,37 +93,33 @@ class TestUS12_ValidateGuideWithoutExecution(unittest.TestCase):
         )
         self.assertEqual(result.returncode, 0)
 
+    def test_dry_run_skips_http_client_import(self):
+        """Dry-run validation doesn't load the HTTP client library."""
+        script = (
+            "import sys, autonomous_ensemble; "
+            "autonomous_ensemble.main(['--dry-run', '--guide', 'coding_guide.txt']); "
+            "print('requests' in sys.modules)"
+        )
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout.splitlines()[-1], "False")
+
     def test_dry_run_displays_parsed_steps(self):
         """System displays all parsed steps with step numbers."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--dry-run",
-             "--guide", "coding_guide.txt"],
-            capture_output=True,
-            text=True
-        )
-        self.assertIn("Step 1:", result.stdout)
-        self.assertIn("Step 2:", result.stdout)
+        returncode, stdout = run_main("--dry-run", "--guide", "coding_guide.txt")
+        self.assertIn("Step 1:", stdout)
+        self.assertIn("Step 2:", stdout)
 
     def test_dry_run_success_message_if_valid(self):
         """System exits with success message if valid."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--dry-run",
-             "--guide", "coding_guide.txt"],
-            capture_output=True,
-            text=True
-        )
-        self.assertIn("validation successful", result.stdout.lower())
+        returncode, stdout = run_main("--dry-run", "--guide", "coding_guide.txt")
+        self.assertIn("validation successful", stdout.lower())
 
     def test_dry_run_error_if_file_missing(self):
         """System exits with error message if file missing."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--dry-run",
-             "--guide", "nonexistent_guide.txt"],
-            capture_output=True,
-            text=True
-        )
-        self.assertEqual(result.returncode, 1)
-        self.assertIn("Error", result.stdout)
+        returncode, stdout = run_main("--dry-run", "--guide", "nonexistent_guide.txt")
+        self.assertEqual(returncode, 1)
+        self.assertIn("Error", stdout)
 
 
 class TestUS13_UseCustomModels(unittest.TestCase):
@@ -111,40 +131,25 @@ class TestUS13_UseCustomModels(unittest.TestCase):
 
     def test_accepts_config_flag(self):
         """System accepts --config flag."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--help"],
-            capture_output=True,
-            text=True
-        )
-        self.assertIn("--config", result.stdout)
+        self.assertIn("--config", cli_help())
 
     def test_config_supports_model_overrides(self):
         """Configuration supports model overrides."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump({
-                "model_a": "custom-model:7b",
-                "model_b": "another-model:13b"
-            }, f)
-            config_file = f.name
-
-        config = Config.from_json(config_file)
+        config = Config.from_json(io.StringIO(json.dumps({
+            "model_a": "custom-model:7b",
+            "model_b": "another-model:13b"
+        })))
         self.assertEqual(config.model_a, "custom-model:7b")
         self.assertEqual(config.model_b, "another-model:13b")
-        os.unlink(config_file)
 
     def test_config_supports_temperature_settings(self):
         """Configuration supports temperature settings."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump({
-                "temp_creative": 0.9,
-                "temp_analytical": 0.1
-            }, f)
-            config_file = f.name
-
-        config = Config.from_json(config_file)
+        config = Config.from_json(io.StringIO(json.dumps({
+            "temp_creative": 0.9,
+            "temp_analytical": 0.1
+        })))
         self.assertEqual(config.temp_creative, 0.9)
         self.assertEqual(config.temp_analytical, 0.1)
-        os.unlink(config_file)
 
 
 class TestUS21_ResumeInterruptedWorkflow(unittest.TestCase):
@@ -156,21 +161,11 @@ class TestUS21_ResumeInterruptedWorkflow(unittest.TestCase):
 
     def test_accepts_checkpoint_flag(self):
         """System accepts --checkpoint flag."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--help"],
-            capture_output=True,
-            text=True
-        )
-        self.assertIn("--checkpoint", result.stdout)
+        self.assertIn("--checkpoint", cli_help())
 
     def test_accepts_resume_flag(self):
         """System accepts --resume flag."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--help"],
-            capture_output=True,
-            text=True
-        )
-        self.assertIn("--resume", result.stdout)
+        self.assertIn("--resume", cli_help())
 
 
 class TestUS22_ChainMultipleGuides(unittest.TestCase):
@@ -182,34 +177,19 @@ class TestUS22_ChainMultipleGuides(unittest.TestCase):
 
     def test_accepts_chain_flag(self):
         """System accepts --chain flag with multiple guide files."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--help"],
-            capture_output=True,
-            text=True
-        )
-        self.assertIn("--chain", result.stdout)
+        self.assertIn("--chain", cli_help())
 
     def test_chain_dry_run_validates_all_guides(self):
         """Dry-run mode validates entire chain."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--dry-run",
-             "--chain", "coding_guide.txt", "post_coding_guide.txt"],
-            capture_output=True,
-            text=True
-        )
-        self.assertEqual(result.returncode, 0)
-        self.assertIn("coding_guide.txt", result.stdout)
-        self.assertIn("post_coding_guide.txt", result.stdout)
+        returncode, stdout = run_main("--dry-run", "--chain", "coding_guide.txt", "post_coding_guide.txt")
+        self.assertEqual(returncode, 0)
+        self.assertIn("coding_guide.txt", stdout)
+        self.assertIn("post_coding_guide.txt", stdout)
 
     def test_chain_shows_total_steps(self):
         """System displays chain progress."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--dry-run",
-             "--chain", "coding_guide.txt", "post_coding_guide.txt"],
-            capture_output=True,
-            text=True
-        )
-        self.assertIn("Total steps:", result.stdout)
+        returncode, stdout = run_main("--dry-run", "--chain", "coding_guide.txt", "post_coding_guide.txt")
+        self.assertIn("Total steps:", stdout)
 
 
 class TestUS23_VerboseProgressMonitoring(unittest.TestCase):
@@ -221,12 +201,7 @@ class TestUS23_VerboseProgressMonitoring(unittest.TestCase):
 
     def test_accepts_verbose_flag(self):
         """System accepts --verbose flag."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--help"],
-            capture_output=True,
-            text=True
-        )
-        self.assertIn("--verbose", result.stdout)
+        self.assertIn("--verbose", cli_help())
 
 
 class TestUS41_HandleMissingFilesGracefully(unittest.TestCase):
@@ -238,27 +213,17 @@ class TestUS41_HandleMissingFilesGracefully(unittest.TestCase):
 
     def test_missing_guide_shows_available_guides(self):
         """Missing guide file shows available guides in directory."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--dry-run",
-             "--guide", "nonexistent.txt"],
-            capture_output=True,
-            text=True
-        )
-        self.assertEqual(result.returncode, 1)
+        returncode, stdout = run_main("--dry-run", "--guide", "nonexistent.txt")
+        self.assertEqual(returncode, 1)
         # Should mention available guides or show error
         self.assertTrue(
-            "Error" in result.stdout or "not found" in result.stdout.lower()
+            "Error" in stdout or "not found" in stdout.lower()
         )
 
     def test_exits_with_nonzero_on_error(self):
         """System exits with non-zero code on errors."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--dry-run",
-             "--guide", "nonexistent.txt"],
-            capture_output=True,
-            text=True
-        )
-        self.assertNotEqual(result.returncode, 0)
+        returncode, stdout = run_main("--dry-run", "--guide", "nonexistent.txt")
+        self.assertNotEqual(returncode, 0)
 
 
 class TestUS51_RunInContainer(unittest.TestCase):
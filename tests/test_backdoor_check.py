@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the backdoor checker script.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import backdoor_check
+from backdoor_check import BackdoorChecker
+
+
+class FakePatternSet:
+    """Stands in for an RE2 set that reports every pattern on every line."""
+
+    def Match(self, line):
+        return list(range(len(BackdoorChecker.PATTERNS)))
+
+
+class TestRE2PatternSet(unittest.TestCase):
+    """Tests for the RE2 set branch of _scan_file."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "app.py")
+        with open(self.path, "w") as f:
+            f.write('password = get_password()\n')
+            f.write('api_key = "abcdef123456"\n')
+            f.write('# TODO: fix security of login\n')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_set_hits_confirmed_with_re(self):
+        """Test that RE2 set hits give the same findings as the re path."""
+        checker = BackdoorChecker(self.tmpdir.name, jobs=1)
+        with patch.object(backdoor_check, "_pattern_set", return_value=None):
+            expected = checker._scan_file(self.path)
+        with patch.object(backdoor_check, "_pattern_set", return_value=FakePatternSet()):
+            findings = checker._scan_file(self.path)
+
+        self.assertEqual(findings, expected)
+        self.assertNotIn(1, [f.line_number for f in findings])
+        self.assertIn(2, [f.line_number for f in findings])
+
+
+class TestScanCache(unittest.TestCase):
+    """Tests for the --cache file of per-file findings."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmpdir.name, "src")
+        os.mkdir(self.root)
+        with open(os.path.join(self.root, "app.py"), "w") as f:
+            f.write('api_key = "abcdef123456"\n')
+        self.cache_path = os.path.join(self.tmpdir.name, "scan-cache.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_cache_written_atomically_and_reused(self):
+        """Test that the cache is written without leftovers and reused."""
+        first = BackdoorChecker(self.root, jobs=1, cache_path=self.cache_path).scan()
+        self.assertEqual(sorted(os.listdir(self.tmpdir.name)), ["scan-cache.json", "src"])
+
+        checker = BackdoorChecker(self.root, jobs=1, cache_path=self.cache_path)
+        with patch.object(checker, "_scan_file") as scan_file:
+            self.assertEqual(checker.scan(), first)
+        scan_file.assert_not_called()
+        self.assertTrue(first)
+
+    def test_malformed_cache_ignored(self):
+        """Test that a cache file without a files mapping is treated as empty."""
+        checker = BackdoorChecker(self.root, jobs=1, cache_path=self.cache_path)
+        with open(self.cache_path, "w") as f:
+            json.dump({"signature": checker._cache_signature(), "files": []}, f)
+        self.assertEqual(checker._load_cache(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
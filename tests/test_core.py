@@ -3,12 +3,18 @@
 Unit tests for Autonomous Coding Ensemble System core components.
 """
 
+import io
 import json
 import os
+import shutil
 import tempfile
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
 
+import requests
+
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -20,6 +26,9 @@ from autonomous_ensemble import (
     StateManager,
     Checkpoint,
     PipelineHooks,
+    ResponseCache,
+    OllamaClient,
+    ModelPipeline,
 )
 
 
@@ -42,23 +51,26 @@ class TestConfig(unittest.TestCase):
         self.assertFalse(config.verbose)
 
     def test_from_json(self):
-        """Test loading Config from JSON file."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump({
-                "model_a": "custom-model:7b",
-                "max_tokens": 4000,
-                "verbose": True
-            }, f)
-            f.flush()
+        """Test loading Config from JSON."""
+        config = Config.from_json(io.StringIO(json.dumps({
+            "model_a": "custom-model:7b",
+            "max_tokens": 4000,
+            "verbose": True
+        })))
+        self.assertEqual(config.model_a, "custom-model:7b")
+        self.assertEqual(config.max_tokens, 4000)
+        self.assertTrue(config.verbose)
+        # Defaults should remain
+        self.assertEqual(config.model_b, "deepseek-coder-v2:16b")
 
-            config = Config.from_json(f.name)
-            self.assertEqual(config.model_a, "custom-model:7b")
-            self.assertEqual(config.max_tokens, 4000)
-            self.assertTrue(config.verbose)
-            # Defaults should remain
-            self.assertEqual(config.model_b, "deepseek-coder-v2:16b")
+    def test_from_json_path(self):
+        """Test loading Config from a JSON file path."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "config.json")
+            with open(path, "w") as f:
+                json.dump({"model_a": "custom-model:7b"}, f)
 
-        os.unlink(f.name)
+            self.assertEqual(Config.from_json(path).model_a, "custom-model:7b")
 
 
 class TestStepContext(unittest.TestCase):
@@ -109,46 +121,286 @@ class TestOllamaRequest(unittest.TestCase):
         self.assertFalse(result["stream"])
         self.assertEqual(result["max_tokens"], 1000)
 
+    def test_keep_alive_omitted_by_default(self):
+        """Test that keep_alive is not sent unless set."""
+        request = OllamaRequest(model="m", prompt="p", temperature=0.5)
+        self.assertNotIn("keep_alive", request.to_dict())
+
+    def test_keep_alive_is_top_level(self):
+        """Test that keep_alive is sent next to options, not inside them."""
+        request = OllamaRequest(model="m", prompt="p", temperature=0.5, keep_alive="10m")
+        result = request.to_dict()
+        self.assertEqual(result["keep_alive"], "10m")
+        self.assertNotIn("keep_alive", result["options"])
+
+
+class TestOllamaClientStreaming(unittest.TestCase):
+    """Tests for streamed response handling in OllamaClient."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_stream_chunks_are_joined(self):
+        """Test that NDJSON chunks are concatenated until done."""
+        response = MagicMock()
+        response.iter_lines.return_value = [
+            b'{"response": "Hello", "done": false}',
+            b'',
+            b'{"response": ", world", "done": false}',
+            b'{"response": "", "done": true}',
+        ]
+        client = OllamaClient(Config())
+        with patch.object(client.session, "post", return_value=response) as mock_post:
+            result = client.query(OllamaRequest(model="m", prompt="p", temperature=0.5, stream=True))
+
+        self.assertEqual(result, "Hello, world")
+        self.assertTrue(mock_post.call_args.kwargs["stream"])
+        response.close.assert_called_once()
+
+    def test_truncated_stream_is_retried(self):
+        """Test that a stream cut off before done is retried, not returned as a partial response."""
+        truncated = MagicMock()
+        truncated.iter_lines.return_value = [b'{"response": "Hel", "done": false}']
+        broken = MagicMock()
+        broken.iter_lines.side_effect = requests.exceptions.ChunkedEncodingError("connection reset")
+        complete = MagicMock()
+        complete.iter_lines.return_value = [b'{"response": "Hello", "done": true}']
+        client = OllamaClient(Config(cache_dir=self.tmpdir.name))
+        request = OllamaRequest(model="m", prompt="p", temperature=0.0, stream=True)
+        with patch.object(client.session, "post", side_effect=[truncated, broken, complete]), \
+                patch("autonomous_ensemble.time.sleep") as mock_sleep:
+            result = client.query(request)
+
+        self.assertEqual(result, "Hello")
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertEqual(client.cache.get(ResponseCache.make_key(request)), "Hello")
+
+    def test_truncated_stream_raises_after_retries(self):
+        """Test that a stream that never completes raises instead of returning partial text."""
+        truncated = MagicMock()
+        truncated.iter_lines.return_value = [b'{"response": "Hel", "done": false}']
+        client = OllamaClient(Config(cache_dir=self.tmpdir.name))
+        request = OllamaRequest(model="m", prompt="p", temperature=0.0, stream=True)
+        with patch.object(client.session, "post", return_value=truncated), \
+                patch("autonomous_ensemble.time.sleep"):
+            with self.assertRaises(ConnectionError):
+                client.query(request)
+
+        self.assertIsNone(client.cache.get(ResponseCache.make_key(request)))
+
+    def test_body_is_sent_as_json_bytes(self):
+        """Test that the request body is pre-encoded JSON with a JSON content type."""
+        response = MagicMock()
+        response.content = b'{"response": "ok"}'
+        client = OllamaClient(Config())
+        request = OllamaRequest(model="m", prompt="héllo", temperature=0.5)
+        with patch.object(client.session, "post", return_value=response) as mock_post:
+            client.query(request)
+
+        body = mock_post.call_args.kwargs["data"]
+        self.assertEqual(json.loads(body), request.to_dict())
+        self.assertEqual(client.session.headers["Content-Type"], "application/json")
+
+    def test_environment_settings_resolved_once(self):
+        """Test that proxy settings are captured with the first session, not per request."""
+        env = {"http_proxy": "http://proxy.internal:3128", "no_proxy": ""}
+        with patch.dict(os.environ, env):
+            client = OllamaClient(Config(ollama_api="http://ollama.internal:11434/api/generate"))
+            session = client.session
+
+        self.assertFalse(session.trust_env)
+        self.assertEqual(session.proxies.get("http"), "http://proxy.internal:3128")
+        # Sessions made later, e.g. on worker threads, reuse the captured settings
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            worker_session = executor.submit(lambda: client.session).result()
+        self.assertEqual(worker_session.proxies.get("http"), "http://proxy.internal:3128")
+
+
+class TestOllamaClientSession(unittest.TestCase):
+    """Tests for HTTP connection reuse in OllamaClient."""
+
+    def test_queries_share_one_pooled_session(self):
+        """Test that every query goes through the client's keep-alive session."""
+        response = MagicMock()
+        response.content = b'{"response": "ok"}'
+        client = OllamaClient(Config())
+        adapter = client.session.get_adapter(client.config.ollama_api)
+        request = OllamaRequest(model="m", prompt="p", temperature=0.5)
+        with patch.object(client.session, "post", return_value=response) as mock_post, \
+                patch("requests.post") as module_post:
+            client.query(request)
+            client.query(request)
+
+        self.assertEqual(mock_post.call_count, 2)
+        module_post.assert_not_called()
+        self.assertEqual(adapter.max_retries.total, 0)
+
+    def test_each_thread_gets_its_own_session(self):
+        """Test that threads never share a session and close() closes them all."""
+        client = OllamaClient(Config())
+        main_session = client.session
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            worker_session = executor.submit(lambda: client.session).result()
+
+        self.assertIs(client.session, main_session)
+        self.assertIsNot(worker_session, main_session)
+        with patch.object(main_session, "close") as main_close, \
+                patch.object(worker_session, "close") as worker_close:
+            client.close()
+        main_close.assert_called_once()
+        worker_close.assert_called_once()
+
+
+class TestOllamaClientRetry(unittest.TestCase):
+    """Tests for OllamaClient retry backoff."""
+
+    def test_timeout_backs_off_exponentially(self):
+        """Test that timeout retries wait longer on each attempt."""
+        client = OllamaClient(Config())
+        with patch.object(client.session, "post", side_effect=requests.exceptions.Timeout), \
+                patch("autonomous_ensemble.random.uniform", return_value=1.0), \
+                patch("autonomous_ensemble.time.sleep") as mock_sleep:
+            with self.assertRaises(TimeoutError):
+                client.query(OllamaRequest(model="m", prompt="p", temperature=0.5))
+
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [1.0, 2.0])
+
+    def test_server_error_honors_retry_after(self):
+        """Test that a 503 with Retry-After waits the requested time and retries."""
+        busy = MagicMock(status_code=503, headers={"Retry-After": "4"})
+        busy.raise_for_status.side_effect = requests.exceptions.HTTPError(response=busy)
+        ok = MagicMock()
+        ok.content = b'{"response": "done"}'
+        client = OllamaClient(Config())
+        with patch.object(client.session, "post", side_effect=[busy, ok]), \
+                patch("autonomous_ensemble.time.sleep") as mock_sleep:
+            result = client.query(OllamaRequest(model="m", prompt="p", temperature=0.5))
+
+        self.assertEqual(result, "done")
+        mock_sleep.assert_called_once_with(4.0)
+
+    def test_backoff_is_capped(self):
+        """Test that backoff never exceeds max_retry_delay plus jitter."""
+        client = OllamaClient(Config())
+        self.assertLessEqual(client._backoff_delay(20), client.max_retry_delay * 1.5)
+        self.assertEqual(client._backoff_delay(0, "120"), client.max_retry_delay)
+
+    def test_stream_error_is_raised(self):
+        """Test that an error object in the stream raises RuntimeError."""
+        response = MagicMock()
+        response.iter_lines.return_value = [b'{"error": "model not found"}']
+        client = OllamaClient(Config())
+        with patch.object(client.session, "post", return_value=response):
+            with self.assertRaises(RuntimeError):
+                client.query(OllamaRequest(model="m", prompt="p", temperature=0.5, stream=True))
+
+
+class TestResponseCache(unittest.TestCase):
+    """Tests for ResponseCache and its use in OllamaClient."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_depends_on_request_fields(self):
+        """Test that any request field change produces a different key."""
+        base = OllamaRequest(model="m", prompt="p", temperature=0.0)
+        key = ResponseCache.make_key(base)
+        self.assertEqual(key, ResponseCache.make_key(OllamaRequest(model="m", prompt="p", temperature=0.0)))
+        self.assertNotEqual(key, ResponseCache.make_key(OllamaRequest(model="m2", prompt="p", temperature=0.0)))
+        self.assertNotEqual(key, ResponseCache.make_key(OllamaRequest(model="m", prompt="p2", temperature=0.0)))
+        self.assertNotEqual(key, ResponseCache.make_key(OllamaRequest(model="m", prompt="p", temperature=0.5)))
+
+    def test_get_set_roundtrip(self):
+        """Test storing and retrieving a response."""
+        cache = ResponseCache(self.tmpdir.name)
+        self.assertIsNone(cache.get("missing"))
+        cache.set("abc", "cached response")
+        self.assertEqual(cache.get("abc"), "cached response")
+
+    def test_failed_write_keeps_previous_entry(self):
+        """Test that an interrupted write leaves the old entry and no temp file."""
+        cache = ResponseCache(self.tmpdir.name)
+        cache.set("abc", "old response")
+        with patch("autonomous_ensemble.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                cache.set("abc", "new response")
+        self.assertEqual(cache.get("abc"), "old response")
+        self.assertEqual(os.listdir(self.tmpdir.name), ["abc.json"])
+
+    def test_client_serves_deterministic_requests_from_cache(self):
+        """Test that a temperature-0 request hits the API only once."""
+        client = OllamaClient(Config(cache_dir=self.tmpdir.name))
+        request = OllamaRequest(model="m", prompt="p", temperature=0.0)
+        with patch.object(client, "_post", return_value="answer") as mock_post:
+            self.assertEqual(client.query(request), "answer")
+            self.assertEqual(client.query(request), "answer")
+        self.assertEqual(mock_post.call_count, 1)
+
+    def test_client_skips_cache_for_nonzero_temperature(self):
+        """Test that sampled requests bypass the cache unless cache_all is set."""
+        request = OllamaRequest(model="m", prompt="p", temperature=0.8)
+
+        client = OllamaClient(Config(cache_dir=self.tmpdir.name))
+        with patch.object(client, "_post", return_value="answer") as mock_post:
+            client.query(request)
+            client.query(request)
+        self.assertEqual(mock_post.call_count, 2)
+
+        client = OllamaClient(Config(cache_dir=self.tmpdir.name, cache_all=True))
+        with patch.object(client, "_post", return_value="answer") as mock_post:
+            client.query(request)
+            client.query(request)
+        self.assertEqual(mock_post.call_count, 1)
+
 
 class TestGuideLoader(unittest.TestCase):
     """Tests for GuideLoader class."""
 
-    def test_load_valid_guide(self):
-        """Test loading a valid guide file."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-            f.write("Step 1: First step\n")
-            f.write("Step 2: Second step\n")
-            f.write("Step 3: Third step\n")
-            f.flush()
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
 
-            loader = GuideLoader(f.name)
-            steps = loader.load()
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
 
-            self.assertEqual(len(steps), 3)
-            self.assertEqual(steps[0], "First step")
-            self.assertEqual(steps[1], "Second step")
-            self.assertEqual(steps[2], "Third step")
+    def _guide_path(self) -> str:
+        return os.path.join(self.tmpdir, f"{self._testMethodName}.txt")
 
-        os.unlink(f.name)
+    def test_load_valid_guide(self):
+        """Test loading a valid guide."""
+        loader = GuideLoader(io.StringIO(
+            "Step 1: First step\n"
+            "Step 2: Second step\n"
+            "Step 3: Third step\n"
+        ))
+        steps = loader.load()
+
+        self.assertEqual(len(steps), 3)
+        self.assertEqual(steps[0], "First step")
+        self.assertEqual(steps[1], "Second step")
+        self.assertEqual(steps[2], "Third step")
 
     def test_load_guide_with_gaps(self):
         """Test loading guide with non-sequential step numbers."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-            f.write("Step 1: First\n")
-            f.write("Step 5: Fifth\n")
-            f.write("Step 3: Third\n")
-            f.flush()
-
-            loader = GuideLoader(f.name)
-            steps = loader.load()
-
-            # Should be sorted by step number
-            self.assertEqual(len(steps), 3)
-            self.assertEqual(steps[0], "First")
-            self.assertEqual(steps[1], "Third")
-            self.assertEqual(steps[2], "Fifth")
-
-        os.unlink(f.name)
+        loader = GuideLoader(io.StringIO(
+            "Step 1: First\n"
+            "Step 5: Fifth\n"
+            "Step 3: Third\n"
+        ))
+        steps = loader.load()
+
+        # Should be sorted by step number
+        self.assertEqual(len(steps), 3)
+        self.assertEqual(steps[0], "First")
+        self.assertEqual(steps[1], "Third")
+        self.assertEqual(steps[2], "Fifth")
 
     def test_load_missing_file(self):
         """Test loading non-existent file raises FileNotFoundError."""
@@ -158,31 +410,113 @@ class TestGuideLoader(unittest.TestCase):
 
     def test_load_empty_guide(self):
         """Test loading empty guide raises ValueError."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-            f.write("This is not a valid step format\n")
-            f.write("Neither is this\n")
-            f.flush()
-
-            loader = GuideLoader(f.name)
-            with self.assertRaises(ValueError):
-                loader.load()
+        loader = GuideLoader(io.StringIO(
+            "This is not a valid step format\n"
+            "Neither is this\n"
+        ))
+        with self.assertRaises(ValueError):
+            loader.load()
 
-        os.unlink(f.name)
+    def test_duplicate_step_reports_line(self):
+        """Test that duplicate step numbers raise ValueError with the line number."""
+        loader = GuideLoader(io.StringIO(
+            "Step 1: First\n"
+            "Notes between steps\n"
+            "  Step 1: Again\n"
+        ))
+        with self.assertRaisesRegex(ValueError, r"Step 1 \(line 3\)"):
+            loader.load()
 
     def test_case_insensitive_step_pattern(self):
         """Test that step pattern is case-insensitive."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-            f.write("STEP 1: Uppercase\n")
-            f.write("step 2: Lowercase\n")
-            f.write("Step 3: Mixed\n")
+        loader = GuideLoader(io.StringIO(
+            "STEP 1: Uppercase\n"
+            "step 2: Lowercase\n"
+            "Step 3: Mixed\n"
+        ))
+        steps = loader.load()
+
+        self.assertEqual(len(steps), 3)
+
+    def test_crlf_and_non_ascii_guide(self):
+        """Test that CRLF line endings and UTF-8 step text load like plain text."""
+        path = self._guide_path()
+        with open(path, "wb") as f:
+            f.write("Step 1: Caf\u00e9 setup\r\nNotes\r\nStep 2: Deploy \u2713\r\n".encode("utf-8"))
+
+        steps = GuideLoader(path).load()
+        self.assertEqual(steps, ["Caf\u00e9 setup", "Deploy \u2713"])
+
+    def test_stream_line_endings_normalized(self):
+        """Test that text and byte streams treat CR and CRLF line breaks like a guide file."""
+        content = "Step 1: First\r\nStep 2: Second\rStep 3: Third\r\n"
+        expected = ["First", "Second", "Third"]
+
+        self.assertEqual(GuideLoader(io.StringIO(content, newline="")).load(), expected)
+        self.assertEqual(GuideLoader(io.BytesIO(content.encode("utf-8"))).load(), expected)
+
+    def test_stream_duplicate_reports_line(self):
+        """Test that duplicate steps read from a stream report their line number."""
+        with self.assertRaisesRegex(ValueError, r"Step 1 \(line 3\)"):
+            GuideLoader(io.BytesIO(b"Step 1: A\r\nNotes\r\nStep 1: B\r\n")).load()
+
+    def test_large_guide_memory_mapped(self):
+        """Test that guides big enough to be memory-mapped parse like small ones."""
+        path = self._guide_path()
+        content = "Step 2: Deploy \u2713\n" + "Notes \u00e9\n" * 40_000 + "Step 1: Caf\u00e9 setup\n"
+        expected = ["Caf\u00e9 setup", "Deploy \u2713"]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        self.assertEqual(GuideLoader(path).load(), expected)
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("Step 2: Again\n")
+        with self.assertRaisesRegex(ValueError, r"Step 2 \(line 40003\)"):
+            GuideLoader(path).load()
+
+        with open(path, "w", encoding="utf-8", newline="\r\n") as f:
+            f.write(content)
+        self.assertEqual(GuideLoader(path).load(), expected)
+
+    def test_reload_uses_cache_until_file_changes(self):
+        """Test that unchanged guides come from the cache and edits invalidate it."""
+        path = self._guide_path()
+        with open(path, "w") as f:
+            f.write("Step 1: First\n")
             f.flush()
 
-            loader = GuideLoader(f.name)
-            steps = loader.load()
+            first = GuideLoader(path).load()
+            with patch("builtins.open", side_effect=AssertionError("re-read")):
+                second = GuideLoader(path).load()
+            self.assertEqual(second, first)
 
-            self.assertEqual(len(steps), 3)
+            # Callers own their list; mutating it must not leak into the cache
+            second.append("mutated")
+            self.assertEqual(GuideLoader(path).load(), ["First"])
 
-        os.unlink(f.name)
+            f.write("Step 2: Second\n")
+            f.flush()
+            self.assertEqual(GuideLoader(path).load(), ["First", "Second"])
+
+        GuideLoader.clear_cache()
+
+    def test_concurrent_loads_with_full_cache(self):
+        """Test that threads evicting from a full cache don't collide."""
+        paths = []
+        for i in range(16):
+            path = os.path.join(self.tmpdir, f"guide_{i}.txt")
+            with open(path, "w") as f:
+                f.write(f"Step 1: Guide {i}\n")
+            paths.append(path)
+
+        with patch.object(GuideLoader, "CACHE_SIZE", 2):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(
+                    lambda path: GuideLoader(path).load(), paths * 20
+                ))
+            self.assertLessEqual(len(GuideLoader._cache), 2)
+        self.assertEqual(results[:16], [[f"Guide {i}"] for i in range(16)])
+        GuideLoader.clear_cache()
 
 
 class TestStateManager(unittest.TestCase):
@@ -218,6 +552,42 @@ class TestStateManager(unittest.TestCase):
         context = state.get_context()
         self.assertEqual(context, state.cumulative_output)
 
+    def test_restore_then_append(self):
+        """Test that restored output is kept when new steps are added."""
+        state = StateManager()
+        state.cumulative_output = "Restored"
+        state.current_step_index = 1
+        state.add_step_output("Next")
+
+        self.assertTrue(state.cumulative_output.startswith("Restored"))
+        self.assertIn("Step 2 Output", state.cumulative_output)
+
+    def test_duplicate_outputs_share_storage(self):
+        """Test that identical step outputs are stored once."""
+        state = StateManager()
+        state.add_step_output("".join(["same ", "output"]))
+        state.add_step_output("".join(["same ", "output"]))
+
+        self.assertEqual(state.step_outputs, ["same output", "same output"])
+        self.assertIs(state.step_outputs[0], state.step_outputs[1])
+
+    def test_output_pool_is_bounded(self):
+        """Test that the shared-output pool keeps only recent outputs."""
+        state = StateManager()
+        for i in range(StateManager.STEP_POOL_SIZE * 2):
+            state.add_step_output(f"output {i}")
+        self.assertEqual(len(state._pool), StateManager.STEP_POOL_SIZE)
+
+    def test_constructor_accepts_cumulative_output(self):
+        """Test that cumulative_output can still be passed to the constructor."""
+        state = StateManager(cumulative_output="Restored", current_step_index=1,
+                             step_outputs=["Restored"])
+        state.add_step_output("Next")
+
+        self.assertTrue(state.cumulative_output.startswith("Restored"))
+        self.assertEqual(state.step_outputs, ["Restored", "Next"])
+        self.assertEqual(StateManager("a"), StateManager(cumulative_output="a"))
+
 
 class TestCheckpoint(unittest.TestCase):
     """Tests for Checkpoint class."""
@@ -268,19 +638,210 @@ class TestCheckpoint(unittest.TestCase):
             timestamp="2024-01-01T00:00:00"
         )
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            checkpoint.save(f.name)
+        buffer = io.BytesIO()
+        checkpoint.save(buffer)
+        buffer.seek(0)
+
+        loaded = Checkpoint.load(buffer)
+
+        self.assertEqual(loaded.guide_file, checkpoint.guide_file)
+        self.assertEqual(loaded.spec, checkpoint.spec)
+        self.assertEqual(loaded.completed_steps, checkpoint.completed_steps)
+        self.assertEqual(loaded.cumulative_output, checkpoint.cumulative_output)
+        self.assertEqual(loaded.step_outputs, checkpoint.step_outputs)
+        self.assertEqual(loaded.timestamp, checkpoint.timestamp)
+
+    def test_large_checkpoint_round_trip(self):
+        """Test that checkpoints big enough to be memory-mapped load intact."""
+        output = "x\u00e9" * 200_000
+        checkpoint = Checkpoint("g.txt", "Spec", 1, output, [output], "2024-01-01T00:00:00")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "checkpoint.json")
+            checkpoint.save(path)
+
+            self.assertEqual(Checkpoint.load(path).to_dict(), checkpoint.to_dict())
+
+    def test_load_from_file_object(self):
+        """Test loading a checkpoint snapshot from an open file object."""
+        checkpoint = Checkpoint("test.txt", "Test", 1, "Output", ["one"], "2024-01-01T00:00:00")
+
+        loaded = Checkpoint.load(io.StringIO(json.dumps(checkpoint.to_dict())))
+
+        self.assertEqual(loaded.to_dict(), checkpoint.to_dict())
+
+    def test_failed_save_keeps_previous_checkpoint(self):
+        """Test that an interrupted save leaves the old checkpoint and no temp file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "checkpoint.json")
+            Checkpoint("g.txt", "Spec", 1, "Old", ["one"], "2024-01-01T00:00:00").save(path)
+
+            newer = Checkpoint("g.txt", "Spec", 2, "New", ["one", "two"], "2024-01-01T00:01:00")
+            with patch("autonomous_ensemble._json_dumps", side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    newer.save(path, durable=True)
+
+            self.assertEqual(Checkpoint.load(path).cumulative_output, "Old")
+            self.assertEqual(os.listdir(tmpdir), ["checkpoint.json"])
+
+
+class TestModelPipelineConvergence(unittest.TestCase):
+    """Tests for iteration convergence in ModelPipeline."""
+
+    def _pipeline(self, responses):
+        client = MagicMock()
+        client.query.side_effect = responses
+        return ModelPipeline(Config(max_iterations=3), client), client
+
+    def test_whitespace_drift_converges(self):
+        """Test that output differing only in whitespace counts as converged."""
+        pipeline, client = self._pipeline(["def f():\n    pass\n\n\n"])
+        ctx = StepContext(step_number=1, step_description="d", spec="s",
+                          draft="def f():\n    pass")
+        self.assertEqual(pipeline._error_correction(ctx), "def f():\n    pass")
+        self.assertEqual(client.query.call_count, 1)
+
+    def test_near_duplicate_converges_with_threshold(self):
+        """Test that a small edit stops iteration when a similarity threshold is set."""
+        client = MagicMock()
+        client.query.side_effect = ["x = compute(values)  # fixed", "unused"]
+        pipeline = ModelPipeline(Config(max_iterations=3, convergence_similarity=0.8), client)
+        ctx = StepContext(step_number=1, step_description="d", spec="s",
+                          draft="x = compute(values)")
+        self.assertEqual(pipeline._error_correction(ctx), "x = compute(values)  # fixed")
+        self.assertEqual(client.query.call_count, 1)
+
+    def test_oscillation_stops_iteration(self):
+        """Test that returning to an earlier output stops iteration."""
+        pipeline, client = self._pipeline(["B", "A", "B"])
+        ctx = StepContext(step_number=1, step_description="d", spec="s", corrected="A")
+        self.assertEqual(pipeline._security_hardening(ctx), "B")
+        self.assertEqual(client.query.call_count, 2)
+
+    def test_iterations_share_prompt_prefix(self):
+        """Test that successive iteration prompts start with the same prefix."""
+        pipeline, client = self._pipeline(["B", "C", "D"])
+        ctx = StepContext(step_number=1, step_description="d", spec="s",
+                          previous_output="history", draft="A")
+        pipeline._error_correction(ctx)
+        prompts = [call.args[0].prompt for call in client.query.call_args_list]
+        prefix = "history\n" + ModelPipeline.CORRECTION_INSTRUCTION
+        self.assertEqual(len(prompts), 3)
+        for prompt, output in zip(prompts, ["A", "B", "C"]):
+            self.assertEqual(prompt, prefix + output + ModelPipeline.CORRECTION_SUFFIX)
+
+
+class TestSpeculativeSecurity(unittest.TestCase):
+    """Tests for overlapping Model B with a speculative Model C pass."""
+
+    def _run(self, correction):
+        client = MagicMock()
+        client.query.side_effect = lambda request: {
+            "model-a": "draft",
+            "model-b": correction,
+        }.get(request.model, "secured " + request.prompt.split("\n")[-2])
+        config = Config(model_a="model-a", model_b="model-b", model_c="model-c",
+                        max_iterations=1, speculative_security=True)
+        ctx = StepContext(step_number=1, step_description="d", spec="s")
+        result = ModelPipeline(config, client).process(ctx)
+        security_sources = [call.args[0].prompt.split("\n")[-2]
+                            for call in client.query.call_args_list
+                            if call.args[0].model == "model-c"]
+        return result, security_sources
+
+    def test_speculative_result_used_when_unchanged(self):
+        """Test that Model C runs once, on the draft, when Model B keeps it."""
+        result, sources = self._run("draft\n")
+        self.assertEqual(result, "secured draft")
+        self.assertEqual(sources, ["draft"])
+
+    def test_rerun_when_correction_changes_draft(self):
+        """Test that Model C re-runs on the corrected output when Model B edits it."""
+        result, sources = self._run("fixed")
+        self.assertEqual(result, "secured fixed")
+        self.assertEqual(sorted(sources), ["draft", "fixed"])
+
+    def test_discarded_run_stops_after_in_flight_request(self):
+        """Test that a discarded speculative run makes no further Model C requests."""
+        main_thread = threading.get_ident()
+        rerun_started = threading.Event()
+        worker_done = threading.Event()
+        speculative_calls = []
+
+        def query(request):
+            if request.model == "model-a":
+                return "draft"
+            if request.model == "model-b":
+                return "fixed"
+            if threading.get_ident() == main_thread:
+                rerun_started.set()
+            else:
+                speculative_calls.append(request)
+                # Still in flight when the main thread discards the run
+                rerun_started.wait(5)
+            return f"secured {len(speculative_calls)} {request.prompt[-40:]}"
+
+        client = MagicMock()
+        client.query.side_effect = query
+        client.close_session.side_effect = worker_done.set
+        config = Config(model_a="model-a", model_b="model-b", model_c="model-c",
+                        max_iterations=3, speculative_security=True)
+        ModelPipeline(config, client).process(StepContext(step_number=1, step_description="d", spec="s"))
+
+        self.assertTrue(worker_done.wait(5))
+        self.assertEqual(len(speculative_calls), 1)
+
+
+class TestCheckpointJournal(unittest.TestCase):
+    """Tests for incremental checkpoint journaling."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "checkpoint.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_load_replays_journal(self):
+        """Test that journaled steps are applied on top of the snapshot."""
+        state = StateManager()
+        state.add_step_output("one")
+        Checkpoint(
+            guide_file="g.txt",
+            spec="Spec",
+            completed_steps=1,
+            cumulative_output=state.cumulative_output,
+            step_outputs=list(state.step_outputs),
+            timestamp="2024-01-01T00:00:00"
+        ).save(self.path)
+        state.add_step_output("two")
+        Checkpoint.append_step(self.path, 2, "two", "2024-01-01T00:01:00")
 
-            loaded = Checkpoint.load(f.name)
+        loaded = Checkpoint.load(self.path)
 
-            self.assertEqual(loaded.guide_file, checkpoint.guide_file)
-            self.assertEqual(loaded.spec, checkpoint.spec)
-            self.assertEqual(loaded.completed_steps, checkpoint.completed_steps)
-            self.assertEqual(loaded.cumulative_output, checkpoint.cumulative_output)
-            self.assertEqual(loaded.step_outputs, checkpoint.step_outputs)
-            self.assertEqual(loaded.timestamp, checkpoint.timestamp)
+        self.assertEqual(loaded.completed_steps, 2)
+        self.assertEqual(loaded.step_outputs, ["one", "two"])
+        self.assertEqual(loaded.cumulative_output, state.cumulative_output)
+        self.assertEqual(loaded.timestamp, "2024-01-01T00:01:00")
 
-        os.unlink(f.name)
+    def test_load_ignores_stale_and_torn_entries(self):
+        """Test that old entries are skipped and a torn last line is ignored."""
+        Checkpoint(
+            guide_file="g.txt",
+            spec="Spec",
+            completed_steps=2,
+            cumulative_output="",
+            step_outputs=["a", "b"],
+            timestamp="t"
+        ).save(self.path)
+        Checkpoint.append_step(self.path, 2, "b", "t2")
+        Checkpoint.append_step(self.path, 3, "c", "t3")
+        with open(Checkpoint.journal_path(self.path), "a") as f:
+            f.write('{"step": 4, "outp')
+
+        loaded = Checkpoint.load(self.path)
+
+        self.assertEqual(loaded.completed_steps, 3)
+        self.assertEqual(loaded.step_outputs, ["a", "b", "c"])
 
 
 class TestPipelineHooks(unittest.TestCase):
@@ -37,14 +37,13 @@ class TestSQLInjection(unittest.TestCase):
         for payload in self.SQL_INJECTION_PAYLOADS:
             with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
                 f.write(f"Step 1: Execute {payload}\n")
-                f.flush()
 
-                loader = GuideLoader(f.name)
-                steps = loader.load()
+            loader = GuideLoader(f.name)
+            steps = loader.load()
 
-                # Payload should be stored as plain text, not executed
-                self.assertEqual(len(steps), 1)
-                self.assertIn(payload, steps[0])
+            # Payload should be stored as plain text, not executed
+            self.assertEqual(len(steps), 1)
+            self.assertIn(payload, steps[0])
 
             os.unlink(f.name)
 
@@ -53,11 +52,10 @@ class TestSQLInjection(unittest.TestCase):
         for payload in self.SQL_INJECTION_PAYLOADS:
             with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
                 json.dump({"model_a": payload}, f)
-                f.flush()
 
-                config = Config.from_json(f.name)
-                # Should store as plain string
-                self.assertEqual(config.model_a, payload)
+            config = Config.from_json(f.name)
+            # Should store as plain string
+            self.assertEqual(config.model_a, payload)
 
             os.unlink(f.name)
 
@@ -83,15 +81,14 @@ class TestXSSAttacks(unittest.TestCase):
         for payload in self.XSS_PAYLOADS:
             with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
                 f.write(f"Step 1: Display {payload}\n")
-                f.flush()
 
-                loader = GuideLoader(f.name)
-                steps = loader.load()
+            loader = GuideLoader(f.name)
+            steps = loader.load()
 
-                # Payload should be stored as plain text
-                self.assertEqual(len(steps), 1)
-                # Step should contain the description (after "Step 1: ")
-                self.assertIn("Display", steps[0])
+            # Payload should be stored as plain text
+            self.assertEqual(len(steps), 1)
+            # Step should contain the description (after "Step 1: ")
+            self.assertIn("Display", steps[0])
 
             os.unlink(f.name)
 
@@ -127,27 +124,24 @@ class TestBufferOverflow(unittest.TestCase):
 
         with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
             f.write(f"Step 1: {long_string}\n")
-            f.flush()
 
-            loader = GuideLoader(f.name)
-            steps = loader.load()
+        loader = GuideLoader(f.name)
+        steps = loader.load()
 
-            self.assertEqual(len(steps), 1)
-            self.assertIn(long_string[:100], steps[0])
+        self.assertEqual(len(steps), 1)
+        self.assertIn(long_string[:100], steps[0])
 
         os.unlink(f.name)
 
     def test_many_steps_no_overflow(self):
         """System handles files with many steps."""
         with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-            for i in range(10000):
-                f.write(f"Step {i+1}: Action number {i+1}\n")
-            f.flush()
+            f.write("".join(f"Step {i+1}: Action number {i+1}\n" for i in range(10000)))
 
-            loader = GuideLoader(f.name)
-            steps = loader.load()
+        loader = GuideLoader(f.name)
+        steps = loader.load()
 
-            self.assertEqual(len(steps), 10000)
+        self.assertEqual(len(steps), 10000)
 
         os.unlink(f.name)
 
@@ -160,11 +154,10 @@ class TestBufferOverflow(unittest.TestCase):
 
         with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
             json.dump({"model_a": "test", "extra": nested}, f)
-            f.flush()
 
-            # Should load without stack overflow
-            config = Config.from_json(f.name)
-            self.assertEqual(config.model_a, "test")
+        # Should load without stack overflow
+        config = Config.from_json(f.name)
+        self.assertEqual(config.model_a, "test")
 
         os.unlink(f.name)
 
@@ -192,15 +185,14 @@ class TestCommandInjection(unittest.TestCase):
         for payload in safe_payloads:
             with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
                 f.write(f"Step 1: Run {payload}\n")
-                f.flush()
 
-                loader = GuideLoader(f.name)
-                steps = loader.load()
+            loader = GuideLoader(f.name)
+            steps = loader.load()
 
-                # Should be plain text
-                self.assertIn(payload, steps[0])
-                # Verify no file was created (if payload was trying to create one)
-                self.assertFalse(os.path.exists("/tmp/pwned"))
+            # Should be plain text
+            self.assertIn(payload, steps[0])
+            # Verify no file was created (if payload was trying to create one)
+            self.assertFalse(os.path.exists("/tmp/pwned"))
 
             os.unlink(f.name)
 
@@ -209,11 +201,10 @@ class TestCommandInjection(unittest.TestCase):
         for payload in self.CMD_INJECTION_PAYLOADS:
             with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
                 json.dump({"model_a": payload}, f)
-                f.flush()
 
-                config = Config.from_json(f.name)
-                # Should be stored as string
-                self.assertEqual(config.model_a, payload)
+            config = Config.from_json(f.name)
+            # Should be stored as string
+            self.assertEqual(config.model_a, payload)
 
             os.unlink(f.name)
 
@@ -264,13 +255,12 @@ class TestFormatStringAttacks(unittest.TestCase):
         for payload in self.FORMAT_STRING_PAYLOADS:
             with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
                 f.write(f"Step 1: Print {payload}\n")
-                f.flush()
 
-                loader = GuideLoader(f.name)
-                steps = loader.load()
+            loader = GuideLoader(f.name)
+            steps = loader.load()
 
-                # Should be stored verbatim
-                self.assertIn(payload, steps[0])
+            # Should be stored verbatim
+            self.assertIn(payload, steps[0])
 
             os.unlink(f.name)
 
@@ -288,11 +278,10 @@ class TestXXEInjection(unittest.TestCase):
         with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
             # Write invalid JSON (XML content)
             f.write(xxe_payload)
-            f.flush()
 
-            # Should fail to parse, not expose /etc/passwd
-            with self.assertRaises(json.JSONDecodeError):
-                Config.from_json(f.name)
+        # Should fail to parse, not expose /etc/passwd
+        with self.assertRaises(json.JSONDecodeError):
+            Config.from_json(f.name)
 
         os.unlink(f.name)
 
@@ -310,19 +299,18 @@ class TestSerializationAttacks(unittest.TestCase):
 
         with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
             json.dump(malicious_json, f)
-            f.flush()
 
-            # JSON.load is safe - won't execute code
-            config = Config.from_json(f.name)
-            # Even if keys are stored, they're just data, not executable
-            # The key point is that JSON parsing is safe and doesn't
-            # invoke __reduce__ or other magic methods
-            self.assertIsInstance(config, Config)
-            # Verify the system wasn't compromised
-            import subprocess
-            result = subprocess.run(['whoami'], capture_output=True, text=True)
-            # If code executed, it would have printed output, but config
-            # should just store the string value, not execute it
+        # JSON.load is safe - won't execute code
+        config = Config.from_json(f.name)
+        # Even if keys are stored, they're just data, not executable
+        # The key point is that JSON parsing is safe and doesn't
+        # invoke __reduce__ or other magic methods
+        self.assertIsInstance(config, Config)
+        # Verify the system wasn't compromised
+        import subprocess
+        result = subprocess.run(['whoami'], capture_output=True, text=True)
+        # If code executed, it would have printed output, but config
+        # should just store the string value, not execute it
 
         os.unlink(f.name)
 
@@ -364,13 +352,12 @@ class TestPrototypePolllution(unittest.TestCase):
         for key, value in malicious_keys.items():
             with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
                 json.dump({"model_a": "test", key: value}, f)
-                f.flush()
 
-                config = Config.from_json(f.name)
-                # Normal values should work
-                self.assertEqual(config.model_a, "test")
-                # Dangerous keys should be ignored
-                self.assertFalse(hasattr(config, key))
+            config = Config.from_json(f.name)
+            # Normal values should work
+            self.assertEqual(config.model_a, "test")
+            # Dangerous keys should be ignored
+            self.assertFalse(hasattr(config, key))
 
             os.unlink(f.name)
 
@@ -383,13 +370,12 @@ class TestNullByteInjection(unittest.TestCase):
         with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
             f.write("Step 1: Test\x00hidden data\n")
             f.write("Step 2: Normal step\n")
-            f.flush()
 
-            loader = GuideLoader(f.name)
-            steps = loader.load()
+        loader = GuideLoader(f.name)
+        steps = loader.load()
 
-            # Should handle gracefully
-            self.assertEqual(len(steps), 2)
+        # Should handle gracefully
+        self.assertEqual(len(steps), 2)
 
         os.unlink(f.name)
 
@@ -398,11 +384,10 @@ class TestNullByteInjection(unittest.TestCase):
         with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
             # JSON with null byte in string
             f.write('{"model_a": "test\\u0000hidden"}')
-            f.flush()
 
-            config = Config.from_json(f.name)
-            # Should parse successfully
-            self.assertIn("test", config.model_a)
+        config = Config.from_json(f.name)
+        # Should parse successfully
+        self.assertIn("test", config.model_a)
 
         os.unlink(f.name)
 
@@ -426,13 +411,12 @@ class TestUnicodeAttacks(unittest.TestCase):
                 with tempfile.NamedTemporaryFile(mode='w', suffix='.txt',
                                                    delete=False, encoding='utf-8') as f:
                     f.write(f"Step 1: Test {payload} end\n")
-                    f.flush()
 
-                    loader = GuideLoader(f.name)
-                    steps = loader.load()
+                loader = GuideLoader(f.name)
+                steps = loader.load()
 
-                    # Should load without crashing
-                    self.assertEqual(len(steps), 1)
+                # Should load without crashing
+                self.assertEqual(len(steps), 1)
 
                 os.unlink(f.name)
             except (UnicodeEncodeError, UnicodeDecodeError, ValueError):
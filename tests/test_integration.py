@@ -6,9 +6,11 @@ These tests verify end-to-end functionality without requiring Ollama.
 They use mocked API responses to test the complete workflow.
 """
 
+import contextlib
+import io
 import json
 import os
-import subprocess
+import shutil
 import sys
 import tempfile
 import unittest
@@ -25,93 +27,91 @@ from autonomous_ensemble import (
     Checkpoint,
     PipelineHooks,
     OllamaClient,
+    main,
 )
 
 
+def run_main(*argv: str):
+    """Run the CLI entry point in-process; return (exit code, stdout)."""
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        try:
+            returncode = main(list(argv))
+        except SystemExit as e:  # argparse exits for --help and usage errors
+            returncode = e.code
+    return returncode, stdout.getvalue()
+
+
 class TestCLIIntegration(unittest.TestCase):
     """Integration tests for CLI interface."""
 
     def test_cli_help(self):
         """Test that --help works and shows usage."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--help"],
-            capture_output=True,
-            text=True
-        )
-        self.assertEqual(result.returncode, 0)
-        self.assertIn("usage:", result.stdout)
-        self.assertIn("--spec", result.stdout)
-        self.assertIn("--guide", result.stdout)
+        returncode, stdout = run_main("--help")
+        self.assertEqual(returncode, 0)
+        self.assertIn("usage:", stdout)
+        self.assertIn("--spec", stdout)
+        self.assertIn("--guide", stdout)
 
     def test_cli_dry_run_single_guide(self):
         """Test dry-run mode with single guide."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--dry-run", "--guide", "coding_guide.txt"],
-            capture_output=True,
-            text=True
-        )
-        self.assertEqual(result.returncode, 0)
-        self.assertIn("Dry run", result.stdout)
-        self.assertIn("Validated", result.stdout)
-        self.assertIn("steps", result.stdout)
+        returncode, stdout = run_main("--dry-run", "--guide", "coding_guide.txt")
+        self.assertEqual(returncode, 0)
+        self.assertIn("Dry run", stdout)
+        self.assertIn("Validated", stdout)
+        self.assertIn("steps", stdout)
 
     def test_cli_dry_run_chain(self):
         """Test dry-run mode with guide chain."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--dry-run",
-             "--chain", "coding_guide.txt", "post_coding_guide.txt"],
-            capture_output=True,
-            text=True
-        )
-        self.assertEqual(result.returncode, 0)
-        self.assertIn("Validating", result.stdout)
-        self.assertIn("guides in chain", result.stdout)
-        self.assertIn("Chain validation successful", result.stdout)
+        returncode, stdout = run_main("--dry-run", "--chain", "coding_guide.txt", "post_coding_guide.txt")
+        self.assertEqual(returncode, 0)
+        self.assertIn("Validating", stdout)
+        self.assertIn("guides in chain", stdout)
+        self.assertIn("Chain validation successful", stdout)
 
     def test_cli_missing_spec_error(self):
         """Test that missing --spec shows error (without dry-run)."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--guide", "coding_guide.txt"],
-            capture_output=True,
-            text=True
-        )
-        self.assertEqual(result.returncode, 1)
-        self.assertIn("--spec is required", result.stdout)
+        returncode, stdout = run_main("--guide", "coding_guide.txt")
+        self.assertEqual(returncode, 1)
+        self.assertIn("--spec is required", stdout)
 
     def test_cli_missing_guide_error(self):
         """Test that missing guide file shows error."""
-        result = subprocess.run(
-            [sys.executable, "autonomous_ensemble.py", "--dry-run", "--guide", "nonexistent.txt"],
-            capture_output=True,
-            text=True
-        )
-        self.assertEqual(result.returncode, 1)
-        self.assertIn("Error", result.stdout)
+        returncode, stdout = run_main("--dry-run", "--guide", "nonexistent.txt")
+        self.assertEqual(returncode, 1)
+        self.assertIn("Error", stdout)
+
+
+def write_fixture(directory: str, name: str, content: str) -> str:
+    """Write a fixture file into directory and return its path."""
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
 
 
 class TestWorkflowIntegration(unittest.TestCase):
     """Integration tests for WorkflowEngine with mocked Ollama."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Write the guide shared by every test in the class."""
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.guide_file = write_fixture(cls.tmpdir, "guide.txt", (
+            "Step 1: Analyze requirements\n"
+            "Step 2: Design solution\n"
+            "Step 3: Implement code\n"
+        ))
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the guide and every test's output."""
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
     def setUp(self):
         """Set up test fixtures."""
-        self.config = Config(verbose=False)
-
-        # Create temporary guide file
-        self.guide_file = tempfile.NamedTemporaryFile(
-            mode='w', suffix='.txt', delete=False
-        )
-        self.guide_file.write("Step 1: Analyze requirements\n")
-        self.guide_file.write("Step 2: Design solution\n")
-        self.guide_file.write("Step 3: Implement code\n")
-        self.guide_file.flush()
-        self.guide_file.close()
-
-    def tearDown(self):
-        """Clean up test fixtures."""
-        os.unlink(self.guide_file.name)
-        # Clean up any output files
-        if os.path.exists(self.config.output_file):
-            os.unlink(self.config.output_file)
+        output_file = os.path.join(self.tmpdir, f"{self._testMethodName}_output.txt")
+        self.config = Config(verbose=False, output_file=output_file)
 
     @patch.object(OllamaClient, 'query')
     def test_workflow_processes_all_steps(self, mock_query):
@@ -119,7 +119,7 @@ class TestWorkflowIntegration(unittest.TestCase):
         mock_query.return_value = "Generated code output"
 
         engine = WorkflowEngine(self.config)
-        result = engine.run("Test spec", self.guide_file.name)
+        result = engine.run("Test spec", self.guide_file)
 
         # Should have called query for each step (3 stages per step)
         # 3 steps * (1 draft + up to 3 corrections + up to 3 security) = variable
@@ -136,7 +136,7 @@ class TestWorkflowIntegration(unittest.TestCase):
         mock_query.return_value = "Output content"
 
         engine = WorkflowEngine(self.config)
-        engine.run("Test spec", self.guide_file.name)
+        engine.run("Test spec", self.guide_file)
 
         self.assertTrue(os.path.exists(self.config.output_file))
         with open(self.config.output_file) as f:
@@ -149,9 +149,9 @@ class TestWorkflowIntegration(unittest.TestCase):
         # Return same output to trigger convergence
         mock_query.return_value = "Converged output"
 
-        config = Config(max_iterations=5, verbose=False)
+        config = Config(max_iterations=5, verbose=False, output_file=self.config.output_file)
         engine = WorkflowEngine(config)
-        engine.run("Test spec", self.guide_file.name)
+        engine.run("Test spec", self.guide_file)
 
         # Should stop early due to convergence, not hit max iterations
         self.assertTrue(mock_query.called)
@@ -160,42 +160,37 @@ class TestWorkflowIntegration(unittest.TestCase):
 class TestCheckpointIntegration(unittest.TestCase):
     """Integration tests for checkpoint/resume functionality."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Write the guide shared by every test in the class."""
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.guide_file = write_fixture(cls.tmpdir, "guide.txt", (
+            "Step 1: First step\n"
+            "Step 2: Second step\n"
+            "Step 3: Third step\n"
+        ))
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the guide, checkpoints and outputs."""
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
     def setUp(self):
         """Set up test fixtures."""
-        self.config = Config(verbose=False)
-
-        # Create temporary guide file
-        self.guide_file = tempfile.NamedTemporaryFile(
-            mode='w', suffix='.txt', delete=False
-        )
-        self.guide_file.write("Step 1: First step\n")
-        self.guide_file.write("Step 2: Second step\n")
-        self.guide_file.write("Step 3: Third step\n")
-        self.guide_file.flush()
-        self.guide_file.close()
-
-        self.checkpoint_file = tempfile.NamedTemporaryFile(
-            mode='w', suffix='.json', delete=False
-        )
-        self.checkpoint_file.close()
-
-    def tearDown(self):
-        """Clean up test fixtures."""
-        os.unlink(self.guide_file.name)
-        os.unlink(self.checkpoint_file.name)
-        if os.path.exists(self.config.output_file):
-            os.unlink(self.config.output_file)
+        prefix = os.path.join(self.tmpdir, self._testMethodName)
+        self.config = Config(verbose=False, output_file=f"{prefix}_output.txt")
+        self.checkpoint_file = f"{prefix}_checkpoint.json"
 
     @patch.object(OllamaClient, 'query')
     def test_checkpoint_saves_progress(self, mock_query):
         """Test that checkpoints are saved after each step."""
         mock_query.return_value = "Step output"
 
-        engine = WorkflowEngine(self.config, checkpoint_file=self.checkpoint_file.name)
-        engine.run("Test spec", self.guide_file.name)
+        engine = WorkflowEngine(self.config, checkpoint_file=self.checkpoint_file)
+        engine.run("Test spec", self.guide_file)
 
         # Checkpoint should exist and be valid JSON
-        with open(self.checkpoint_file.name) as f:
+        with open(self.checkpoint_file) as f:
             checkpoint_data = json.load(f)
 
         self.assertEqual(checkpoint_data["completed_steps"], 3)
@@ -206,20 +201,20 @@ class TestCheckpointIntegration(unittest.TestCase):
         """Test resuming from a saved checkpoint."""
         # Create a checkpoint at step 2
         checkpoint = Checkpoint(
-            guide_file=self.guide_file.name,
+            guide_file=self.guide_file,
             spec="Test spec",
             completed_steps=2,
             cumulative_output="Previous output",
             step_outputs=["Step 1", "Step 2"],
             timestamp="2024-01-01T00:00:00"
         )
-        checkpoint.save(self.checkpoint_file.name)
+        checkpoint.save(self.checkpoint_file)
 
         mock_query.return_value = "Resumed output"
 
         engine = WorkflowEngine(self.config)
-        result = engine.run("Test spec", self.guide_file.name,
-                           resume_from=self.checkpoint_file.name)
+        result = engine.run("Test spec", self.guide_file,
+                           resume_from=self.checkpoint_file)
 
         # Should contain previous output
         self.assertIn("Previous output", result)
@@ -230,42 +225,59 @@ class TestCheckpointIntegration(unittest.TestCase):
 class TestGuideChainIntegration(unittest.TestCase):
     """Integration tests for guide chaining."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Write the two guides shared by every test in the class."""
+        cls.guide_dir = tempfile.mkdtemp()
+        cls.guide1 = write_fixture(cls.guide_dir, "first_guide.txt", (
+            "Step 1: Guide 1 Step 1\n"
+            "Step 2: Guide 1 Step 2\n"
+        ))
+        cls.guide2 = write_fixture(cls.guide_dir, "second_guide.txt", (
+            "Step 1: Guide 2 Step 1\n"
+            "Step 2: Guide 2 Step 2\n"
+        ))
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the shared guides."""
+        shutil.rmtree(cls.guide_dir, ignore_errors=True)
+
     def setUp(self):
         """Set up test fixtures."""
-        self.config = Config(verbose=False, output_file="chain_output.txt")
-
-        # Create two temporary guide files
-        self.guide1 = tempfile.NamedTemporaryFile(
-            mode='w', suffix='_guide.txt', delete=False
-        )
-        self.guide1.write("Step 1: Guide 1 Step 1\n")
-        self.guide1.write("Step 2: Guide 1 Step 2\n")
-        self.guide1.flush()
-        self.guide1.close()
+        # Chain outputs land in the working directory; give each test its own
+        # so parallel workers can't clean up each other's files
+        self.original_cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp()
+        os.chdir(self.workdir)
 
-        self.guide2 = tempfile.NamedTemporaryFile(
-            mode='w', suffix='_guide.txt', delete=False
-        )
-        self.guide2.write("Step 1: Guide 2 Step 1\n")
-        self.guide2.write("Step 2: Guide 2 Step 2\n")
-        self.guide2.flush()
-        self.guide2.close()
+        self.config = Config(verbose=False, output_file="chain_output.txt")
 
     def tearDown(self):
         """Clean up test fixtures."""
-        os.unlink(self.guide1.name)
-        os.unlink(self.guide2.name)
         # Clean up output files
-        for f in os.listdir('.'):
-            if f.startswith('output_') or f == 'chain_output.txt':
-                os.unlink(f)
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
 
     def test_chain_dry_run_validates_all_guides(self):
         """Test that dry-run validates all guides in chain."""
         chain = GuideChain(self.config)
 
         # Should not raise any exceptions
-        chain.dry_run([self.guide1.name, self.guide2.name])
+        chain.dry_run([self.guide1, self.guide2])
+
+    def test_chain_dry_run_reports_in_order(self):
+        """Test that dry-run reports guides in chain order and surfaces load errors."""
+        chain = GuideChain(self.config)
+        with patch("builtins.print") as mock_print:
+            chain.dry_run([self.guide2, self.guide1])
+
+        headers = [c.args[0] for c in mock_print.call_args_list if c.args and "steps" in str(c.args[0])]
+        self.assertIn(self.guide2, headers[0])
+        self.assertIn(self.guide1, headers[1])
+
+        with self.assertRaises(FileNotFoundError):
+            chain.dry_run([self.guide1, "/nonexistent/guide.txt"])
 
     @patch.object(OllamaClient, 'query')
     def test_chain_processes_all_guides(self, mock_query):
@@ -273,31 +285,73 @@ class TestGuideChainIntegration(unittest.TestCase):
         mock_query.return_value = "Chain output"
 
         chain = GuideChain(self.config)
-        result = chain.run("Test spec", [self.guide1.name, self.guide2.name])
+        result = chain.run("Test spec", [self.guide1, self.guide2])
 
         # Output should reference both guides
         self.assertIn("Output from", result)
 
+    @patch.object(OllamaClient, 'query')
+    def test_chain_shares_one_client(self, mock_query):
+        """Test that every guide in the chain queries through the same client."""
+        mock_query.return_value = "Chain output"
+
+        chain = GuideChain(self.config)
+        with patch("autonomous_ensemble.WorkflowEngine", wraps=WorkflowEngine) as engine_cls:
+            chain.run("Test spec", [self.guide1, self.guide2])
+
+        clients = {id(call.kwargs["client"]) for call in engine_cls.call_args_list}
+        self.assertEqual(clients, {id(chain.client)})
+
+    @patch.object(OllamaClient, 'query')
+    def test_chain_engines_inherit_config(self, mock_query):
+        """Test that per-guide configs keep every setting except the output file."""
+        mock_query.return_value = "Chain output"
+        self.config.max_iterations = 1
+        self.config.convergence_similarity = 0.9
+
+        chain = GuideChain(self.config)
+        with patch("autonomous_ensemble.WorkflowEngine", wraps=WorkflowEngine) as engine_cls:
+            chain.run("Test spec", [self.guide1, self.guide2])
+
+        for call in engine_cls.call_args_list:
+            engine_config = call.args[0]
+            self.assertEqual(engine_config.max_iterations, 1)
+            self.assertEqual(engine_config.convergence_similarity, 0.9)
+            self.assertTrue(engine_config.output_file.startswith("output_"))
+
+    @patch.object(OllamaClient, 'query')
+    def test_chain_embeds_spec_file_contents(self, mock_query):
+        """Test that later guides see the spec file contents, not its path."""
+        mock_query.return_value = "Chain output"
+        spec_file = write_fixture(self.workdir, "spec.txt", "Build a todo app")
+
+        chain = GuideChain(self.config)
+        chain.run(spec_file, [self.guide1, self.guide2])
+
+        prompts = [call.args[0].prompt for call in mock_query.call_args_list]
+        last_draft_prompt = [p for p in prompts if "Generate a creative draft" in p][-1]
+        self.assertIn("Build a todo app", last_draft_prompt)
+        self.assertNotIn(spec_file, last_draft_prompt)
+
 
 class TestHooksIntegration(unittest.TestCase):
     """Integration tests for pipeline hooks."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.config = Config(verbose=False)
+    @classmethod
+    def setUpClass(cls):
+        """Write the guide shared by every test in the class."""
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.guide_file = write_fixture(cls.tmpdir, "guide.txt", "Step 1: Single step\n")
 
-        self.guide_file = tempfile.NamedTemporaryFile(
-            mode='w', suffix='.txt', delete=False
-        )
-        self.guide_file.write("Step 1: Single step\n")
-        self.guide_file.flush()
-        self.guide_file.close()
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the guide and every test's output."""
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
 
-    def tearDown(self):
-        """Clean up test fixtures."""
-        os.unlink(self.guide_file.name)
-        if os.path.exists(self.config.output_file):
-            os.unlink(self.config.output_file)
+    def setUp(self):
+        """Set up test fixtures."""
+        output_file = os.path.join(self.tmpdir, f"{self._testMethodName}_output.txt")
+        self.config = Config(verbose=False, output_file=output_file)
 
     @patch.object(OllamaClient, 'query')
     def test_post_draft_hook_applied(self, mock_query):
@@ -309,7 +363,7 @@ class TestHooksIntegration(unittest.TestCase):
 
         hooks = PipelineHooks(post_draft=replace_placeholder)
         engine = WorkflowEngine(self.config, hooks=hooks)
-        result = engine.run("Test spec", self.guide_file.name)
+        result = engine.run("Test spec", self.guide_file)
 
         # Hook should have transformed the output
         # Note: The transformation happens internally, final output
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Unit tests for structured logging configuration.
+"""
+
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging_config
+from logging_config import (
+    CodeCobraLogger,
+    ColumnarJSONFormatter,
+    JSONFormatter,
+    _encode_fallback,
+    decode_columnar,
+)
+
+
+def make_record(message="hello %s", args=("world",), **extra):
+    """Build a LogRecord with optional extra fields."""
+    record = logging.LogRecord("test", logging.INFO, "/src/app.py", 42, message, args, None,
+                               func="run")
+    record.__dict__.update(extra)
+    return record
+
+
+class Stage(Enum):
+    """Enum value passed as a log extra."""
+    DRAFT = "draft"
+
+
+class TestEncodeFallback(unittest.TestCase):
+    """Tests for values the JSON encoder can't handle natively."""
+
+    def test_fallback_values(self):
+        """Test enums by value, sets as lists and anything else as str()."""
+        self.assertEqual(_encode_fallback(Stage.DRAFT), "draft")
+        self.assertEqual(_encode_fallback({1}), [1])
+        self.assertEqual(sorted(_encode_fallback(frozenset({"a", "b"}))), ["a", "b"])
+        self.assertEqual(_encode_fallback(object).__class__, str)
+
+    def test_extra_fields_serialize_with_and_without_orjson(self):
+        """Test that both encoders write the same line for odd extra values."""
+        record = make_record(stage=Stage.DRAFT, tags={"x"}, error=ValueError("bad"))
+        decoded = []
+        for orjson_available in (True, False):
+            if orjson_available and not logging_config.ORJSON_AVAILABLE:
+                continue
+            with patch.object(logging_config, "ORJSON_AVAILABLE", orjson_available):
+                decoded.append(json.loads(JSONFormatter().format(record)))
+        for data in decoded:
+            self.assertEqual(data["stage"], "draft")
+            self.assertEqual(data["tags"], ["x"])
+            self.assertEqual(data["error"], "bad")
+
+
+class TestJSONFormatterSource(unittest.TestCase):
+    """Tests for JSONFormatter's include_source switch."""
+
+    def test_source_included_by_default(self):
+        """Test that records carry their file, line and function."""
+        data = json.loads(JSONFormatter().format(make_record()))
+        self.assertEqual(data["source"], {"file": "app.py", "line": 42, "function": "run"})
+
+    def test_source_omitted_when_disabled(self):
+        """Test that include_source=False drops the source block."""
+        data = json.loads(JSONFormatter(include_source=False).format(make_record()))
+        self.assertNotIn("source", data)
+        self.assertEqual(data["message"], "hello world")
+
+
+class TestJSONFormatterTimestamp(unittest.TestCase):
+    """Tests for JSONFormatter's cached timestamp formatting."""
+
+    def test_matches_utc_isoformat(self):
+        """Test that timestamps equal datetime's UTC formatting."""
+        formatter = JSONFormatter()
+        for created in (1700000000.0, 1700000000.123456, 1700000001.999999):
+            expected = datetime.fromtimestamp(created, timezone.utc).strftime(
+                "%Y-%m-%dT%H:%M:%S.%fZ")
+            self.assertEqual(formatter._format_timestamp(created), expected)
+
+    def test_strftime_runs_once_per_second(self):
+        """Test that records in the same second reuse the formatted prefix."""
+        formatter = JSONFormatter()
+        with patch("logging_config.time.strftime", wraps=time.strftime) as strftime:
+            formatter._format_timestamp(1700000000.1)
+            formatter._format_timestamp(1700000000.9)
+            self.assertEqual(strftime.call_count, 1)
+            formatter._format_timestamp(1700000001.2)
+            self.assertEqual(strftime.call_count, 2)
+
+
+class TestColumnarJSONFormatter(unittest.TestCase):
+    """Tests for ColumnarJSONFormatter and decode_columnar."""
+
+    def test_roundtrip_matches_json_formatter(self):
+        """Test that decoded records equal what JSONFormatter writes."""
+        plain = JSONFormatter()
+        columnar = ColumnarJSONFormatter()
+        records = [
+            make_record(event="step_start", step_number=1),
+            make_record(event="step_start", step_number=2),
+            make_record("done", (), event="workflow_complete"),
+        ]
+        expected = [json.loads(plain.format(record)) for record in records]
+        output = "\n".join(columnar.format(record) for record in records)
+        self.assertEqual(list(decode_columnar(output.splitlines())), expected)
+
+    def test_schema_written_once_per_shape(self):
+        """Test that repeated record shapes reuse the first schema line."""
+        columnar = ColumnarJSONFormatter()
+        first = columnar.format(make_record(event="a"))
+        second = columnar.format(make_record(event="b"))
+        self.assertEqual(len(first.splitlines()), 2)
+        self.assertEqual(len(second.splitlines()), 1)
+
+    def test_schema_ids_unique_across_threads(self):
+        """Test that concurrent new shapes never share a schema id."""
+        columnar = ColumnarJSONFormatter()
+        records = [make_record(**{f"field_{i}": i}) for i in range(200)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            output = "\n".join(executor.map(columnar.format, records))
+
+        schema_ids = [json.loads(line)["_schema"] for line in output.splitlines()
+                      if line.startswith('{"_schema"')]
+        self.assertEqual(sorted(schema_ids), list(range(200)))
+        decoded = list(decode_columnar(output.splitlines()))
+        self.assertEqual(len(decoded), 200)
+        for record in decoded:
+            self.assertTrue(any(key.startswith("field_") for key in record))
+
+    def test_plain_lines_pass_through(self):
+        """Test that JSONFormatter lines in the stream decode unchanged."""
+        line = JSONFormatter().format(make_record(event="a"))
+        self.assertEqual(list(decode_columnar([line, ""])), [json.loads(line)])
+
+
+class RecordingHandler(logging.Handler):
+    """Handler that keeps every record it receives."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestCodeCobraLogger(unittest.TestCase):
+    """Tests for CodeCobraLogger event helpers."""
+
+    def setUp(self):
+        self.log = CodeCobraLogger(name="test_code_cobra", level=logging.DEBUG)
+        self.handler = RecordingHandler()
+        self.log.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.log.logger.handlers = []
+
+    def test_hot_path_records_point_at_helper(self):
+        """Test that _emit attributes records to the helper that built them."""
+        self.log.step_start(1, 3, "Write the parser")
+        record = self.handler.records[-1]
+        self.assertEqual(record.funcName, "step_start")
+        self.assertEqual(record.filename, "logging_config.py")
+        self.assertEqual(record.getMessage(), "Step 1/3 started")
+        self.assertEqual(record.event, "step_start")
+
+
+class TestCompressedLogFile(unittest.TestCase):
+    """Tests for rotating and gzipping the JSON log file."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmpdir.name, "cobra.log")
+
+    def tearDown(self):
+        logging.getLogger("test_compressed").handlers = []
+        self.tmpdir.cleanup()
+
+    def test_rotated_files_are_gzipped(self):
+        """Test that rotated files get a .gz suffix and hold the JSON lines."""
+        with patch.object(logging_config, "LOG_FILE_MAX_BYTES", 300):
+            log = CodeCobraLogger(name="test_compressed", log_file=self.log_file, compress=True)
+        console, file_handler = log.logger.handlers
+        log.logger.removeHandler(console)
+        for step in range(1, 6):
+            log.step_complete(step, 5)
+        file_handler.close()
+
+        self.assertTrue(os.path.exists(self.log_file + ".1.gz"))
+        self.assertFalse(os.path.exists(self.log_file + ".1"))
+        with gzip.open(self.log_file + ".1.gz", "rt") as f:
+            events = [json.loads(line)["event"] for line in f if line.strip()]
+        self.assertTrue(events)
+        self.assertEqual(set(events), {"step_complete"})
+
+    def test_plain_file_without_compress(self):
+        """Test that the default file handler does not rotate."""
+        log = CodeCobraLogger(name="test_compressed", log_file=self.log_file)
+        self.assertIs(type(log.logger.handlers[1]), logging.FileHandler)
+        log.logger.handlers[1].close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the monitoring module.
+"""
+
+import os
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from monitoring import ErrorTracker, PerformanceMonitor, SystemMetrics, _fast_iso_now
+
+
+class TestFastIsoNow(unittest.TestCase):
+    """Tests for the cached-prefix timestamp helper."""
+
+    def test_matches_datetime_isoformat(self):
+        """Test that output matches datetime.now().isoformat() formatting."""
+        for now in (1700000000.0, 1700000000.25, 1700000001.999999):
+            with patch("monitoring.time.time", return_value=now):
+                expected = datetime.fromtimestamp(now).strftime("%Y-%m-%dT%H:%M:%S.%f")
+                self.assertEqual(_fast_iso_now(), expected)
+
+
+class TestErrorTracker(unittest.TestCase):
+    """Tests for ErrorTracker's bounded error history."""
+
+    def test_history_keeps_newest_errors(self):
+        """Test that the oldest errors are dropped past max_errors."""
+        tracker = ErrorTracker(max_errors=3)
+        for i in range(5):
+            tracker.record_error("timeout", f"error {i}")
+
+        self.assertEqual([e["message"] for e in tracker.errors], ["error 2", "error 3", "error 4"])
+        self.assertEqual(tracker.get_error_summary(), {"timeout": 5})
+
+    def test_recent_errors(self):
+        """Test get_recent_errors for counts below, above and at zero."""
+        tracker = ErrorTracker()
+        for i in range(3):
+            tracker.record_error("timeout", f"error {i}")
+
+        self.assertEqual([e["message"] for e in tracker.get_recent_errors(2)], ["error 1", "error 2"])
+        self.assertEqual(len(tracker.get_recent_errors(10)), 3)
+        self.assertEqual(tracker.get_recent_errors(0), [])
+
+    def test_clear(self):
+        """Test that clear empties both the history and the counts."""
+        tracker = ErrorTracker()
+        tracker.record_error("timeout", "error")
+        tracker.clear()
+        self.assertEqual(list(tracker.errors), [])
+        self.assertEqual(tracker.get_error_summary(), {})
+
+
+class TestAverageMetrics(unittest.TestCase):
+    """Tests for PerformanceMonitor.get_average_metrics."""
+
+    def setUp(self):
+        self.monitor = PerformanceMonitor(sample_interval=60.0)
+
+    def test_averages_window(self):
+        """Test that only the last N minutes of samples are averaged."""
+        for cpu in (100.0, 10.0, 20.0, 30.0):
+            self.monitor.samples.append(SystemMetrics(cpu_percent=cpu, thread_count=4))
+        average = self.monitor.get_average_metrics(minutes=3)
+        self.assertEqual(average.cpu_percent, 20.0)
+        self.assertEqual(average.thread_count, 4)
+
+    def test_cached_average_refreshed_by_new_sample(self):
+        """Test that the cached average is reused until a sample is taken."""
+        self.monitor.samples.append(SystemMetrics(cpu_percent=10.0))
+        first = self.monitor.get_average_metrics(minutes=5)
+        self.assertEqual(self.monitor.get_average_metrics(minutes=5), first)
+
+        self.monitor.samples.append(SystemMetrics(cpu_percent=30.0))
+        self.assertEqual(self.monitor.get_average_metrics(minutes=5).cpu_percent, 20.0)
+
+    def test_cached_average_refreshed_when_window_is_full(self):
+        """Test that a new sample is seen once the history is at its bound."""
+        for _ in range(self.monitor.max_samples):
+            self.monitor.samples.append(SystemMetrics(cpu_percent=10.0))
+        self.assertEqual(self.monitor.get_average_metrics(minutes=1).cpu_percent, 10.0)
+
+        self.monitor.samples.append(SystemMetrics(cpu_percent=50.0))
+        self.assertEqual(self.monitor.get_average_metrics(minutes=1).cpu_percent, 50.0)
+
+    def test_sample_history_is_bounded(self):
+        """Test that samples beyond max_samples drop the oldest."""
+        for cpu in range(self.monitor.max_samples + 5):
+            self.monitor.samples.append(SystemMetrics(cpu_percent=float(cpu)))
+        self.assertEqual(len(self.monitor.samples), self.monitor.max_samples)
+        self.assertEqual(self.monitor.samples[0].cpu_percent, 5.0)
+
+    def test_returned_average_is_a_copy(self):
+        """Test that mutating a returned average doesn't corrupt the cache."""
+        self.monitor.samples.append(SystemMetrics(cpu_percent=10.0))
+        self.monitor.get_average_metrics(minutes=5).cpu_percent = 99.0
+        self.assertEqual(self.monitor.get_average_metrics(minutes=5).cpu_percent, 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ Security tests for Autonomous Coding Ensemble System.
 Validates input handling, path security, and configuration safety.
 """
 
+import io
 import json
 import os
 import sys
@@ -21,21 +22,17 @@ class TestInputValidation(unittest.TestCase):
 
     def test_guide_loader_rejects_shell_injection(self):
         """Guide loader doesn't execute shell commands in step descriptions."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-            f.write("Step 1: $(rm -rf /)\n")
-            f.write("Step 2: `whoami`\n")
-            f.write("Step 3: ; cat /etc/passwd\n")
-            f.flush()
-
-            loader = GuideLoader(f.name)
-            steps = loader.load()
-
-            # Steps should be loaded as plain text, not executed
-            self.assertEqual(len(steps), 3)
-            self.assertIn("$(rm -rf /)", steps[0])
-            self.assertIn("`whoami`", steps[1])
-
-        os.unlink(f.name)
+        loader = GuideLoader(io.StringIO(
+            "Step 1: $(rm -rf /)\n"
+            "Step 2: `whoami`\n"
+            "Step 3: ; cat /etc/passwd\n"
+        ))
+        steps = loader.load()
+
+        # Steps should be loaded as plain text, not executed
+        self.assertEqual(len(steps), 3)
+        self.assertIn("$(rm -rf /)", steps[0])
+        self.assertIn("`whoami`", steps[1])
 
     def test_config_rejects_invalid_keys(self):
         """Config ignores unknown keys from JSON."""
@@ -46,35 +43,31 @@ class TestInputValidation(unittest.TestCase):
                 "exec": "os.system('rm -rf /')",
                 "eval": "dangerous_code()"
             }, f)
-            f.flush()
 
-            config = Config.from_json(f.name)
+        config = Config.from_json(f.name)
 
-            # Valid key should work
-            self.assertEqual(config.model_a, "valid-model")
-            # Dangerous keys should be ignored
-            self.assertFalse(hasattr(config, "__class__override"))
-            self.assertFalse(hasattr(config, "exec"))
-            self.assertFalse(hasattr(config, "eval"))
+        # Valid key should work
+        self.assertEqual(config.model_a, "valid-model")
+        # Dangerous keys should be ignored
+        self.assertFalse(hasattr(config, "__class__override"))
+        self.assertFalse(hasattr(config, "exec"))
+        self.assertFalse(hasattr(config, "eval"))
 
         os.unlink(f.name)
 
     def test_guide_loader_handles_unicode_safely(self):
         """Guide loader handles unicode characters safely."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as f:
-            f.write("Step 1: Handle émojis 🐍\n")
-            f.write("Step 2: Support 中文\n")
-            f.write("Step 3: Accept кириллица\n")
-            f.flush()
-
-            loader = GuideLoader(f.name)
-            steps = loader.load()
-
-            self.assertEqual(len(steps), 3)
-            self.assertIn("🐍", steps[0])
-            self.assertIn("中文", steps[1])
+        # Bytes, as read from a guide file, so step text goes through the UTF-8 decode
+        loader = GuideLoader(io.BytesIO(
+            "Step 1: Handle émojis 🐍\n"
+            "Step 2: Support 中文\n"
+            "Step 3: Accept кириллица\n".encode("utf-8")
+        ))
+        steps = loader.load()
 
-        os.unlink(f.name)
+        self.assertEqual(len(steps), 3)
+        self.assertIn("🐍", steps[0])
+        self.assertIn("中文", steps[1])
 
 
 class TestPathSecurity(unittest.TestCase):
@@ -91,12 +84,11 @@ class TestPathSecurity(unittest.TestCase):
         # Create a guide file with normal content
         with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
             f.write("Step 1: Normal step\n")
-            f.flush()
 
-            # Loader should work with valid path
-            loader = GuideLoader(f.name)
-            steps = loader.load()
-            self.assertEqual(len(steps), 1)
+        # Loader should work with valid path
+        loader = GuideLoader(f.name)
+        steps = loader.load()
+        self.assertEqual(len(steps), 1)
 
         os.unlink(f.name)
 
@@ -222,24 +214,20 @@ class TestNoCodeExecution(unittest.TestCase):
 
     def test_guide_step_not_evaluated(self):
         """Guide steps should not be evaluated as Python code."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-            f.write("Step 1: __import__('os').system('whoami')\n")
-            f.write("Step 2: eval('print(1)')\n")
-            f.write("Step 3: exec('import sys')\n")
-            f.flush()
-
-            loader = GuideLoader(f.name)
-            steps = loader.load()
-
-            # Steps should be plain strings
-            self.assertIn("__import__", steps[0])
-            self.assertIn("eval", steps[1])
-            self.assertIn("exec", steps[2])
-
-            # None of these should have been executed
-            # (This test would fail if eval/exec was called)
-
-        os.unlink(f.name)
+        loader = GuideLoader(io.StringIO(
+            "Step 1: __import__('os').system('whoami')\n"
+            "Step 2: eval('print(1)')\n"
+            "Step 3: exec('import sys')\n"
+        ))
+        steps = loader.load()
+
+        # Steps should be plain strings
+        self.assertIn("__import__", steps[0])
+        self.assertIn("eval", steps[1])
+        self.assertIn("exec", steps[2])
+
+        # None of these should have been executed
+        # (This test would fail if eval/exec was called)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Unit tests for telemetry metrics collection.
+"""
+
+import os
+import threading
+import unittest
+from array import array
+from datetime import datetime
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telemetry import MetricPoint, MetricsCollector
+
+
+class TestMetricPoint(unittest.TestCase):
+    """Tests for MetricPoint timestamps."""
+
+    def test_timestamp_keyword_still_accepted(self):
+        """Test that an ISO timestamp passed to the constructor round-trips."""
+        point = MetricPoint(name="m", value=1.0, timestamp="2024-01-01T12:00:00.250000")
+        self.assertEqual(point.timestamp, "2024-01-01T12:00:00.250000")
+        self.assertEqual(point.labels, {})
+        self.assertEqual(point.metric_type, "gauge")
+
+    def test_timestamp_formatted_from_ns(self):
+        """Test that points recorded by the collector format their time."""
+        collector = MetricsCollector()
+        collector.record_gauge("g", 3.0)
+        point = collector.metrics["g"][-1]
+        recorded = datetime.fromisoformat(point.timestamp)
+        self.assertLess(abs((datetime.now() - recorded).total_seconds()), 60)
+
+
+class TestWorkflowTracking(unittest.TestCase):
+    """Tests for workflow tracking under the collector lock."""
+
+    def test_workflow_lifecycle_does_not_deadlock(self):
+        """Test that workflow methods don't re-acquire the collector lock."""
+        collector = MetricsCollector()
+
+        def run_workflow():
+            collector.start_workflow("wf", total_steps=2)
+            collector.complete_step("wf", "model_a", tokens=10)
+            collector.fail_step("wf", "timeout")
+            collector.end_workflow("wf", status="failed")
+
+        thread = threading.Thread(target=run_workflow, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive(), "workflow tracking deadlocked")
+
+        totals = collector.counter_totals()
+        self.assertEqual(totals["workflows_started"], 1.0)
+        self.assertEqual(totals["steps_completed"], 1.0)
+        self.assertEqual(totals["steps_failed"], 1.0)
+        self.assertEqual(totals["workflows_failed"], 1.0)
+        self.assertEqual(collector.get_workflow_metrics("wf").model_a_calls, 1)
+
+
+class TestHistograms(unittest.TestCase):
+    """Tests for packed histogram storage and the bounded audit trail."""
+
+    def test_values_stored_as_packed_doubles(self):
+        """Test that histogram values live in a float array."""
+        collector = MetricsCollector()
+        for value in (3.0, 1.0, 2.0):
+            collector.record_histogram("latency", value)
+        self.assertEqual(collector.histograms["latency"], array("d", [3.0, 1.0, 2.0]))
+
+        stats = collector.get_summary()["histograms"]["latency"]
+        self.assertEqual((stats["count"], stats["min"], stats["max"]), (3, 1.0, 3.0))
+        self.assertEqual(stats["p50"], 2.0)
+
+    def test_percentiles_follow_new_values(self):
+        """Test that values added after a scrape are included in the next one."""
+        collector = MetricsCollector()
+        collector.record_histogram("latency", 5.0)
+        collector.export_prometheus()
+        collector.record_histogram("latency", 1.0)
+        self.assertEqual(collector.get_summary()["histograms"]["latency"]["min"], 1.0)
+
+    def test_audit_trail_is_bounded(self):
+        """Test that only the most recent max_points points are kept."""
+        collector = MetricsCollector(max_points=3)
+        for value in range(5):
+            collector.record_histogram("latency", float(value))
+        self.assertEqual([p.value for p in collector.metrics["latency"]], [2.0, 3.0, 4.0])
+        self.assertEqual(len(collector.histograms["latency"]), 5)
+
+    def test_audit_trail_disabled(self):
+        """Test that max_points=0 records no points."""
+        collector = MetricsCollector(max_points=0)
+        collector.record_gauge("g", 1.0)
+        self.assertEqual(dict(collector.metrics), {})
+
+
+class TestShardedCounters(unittest.TestCase):
+    """Tests for per-thread counter shards when the audit trail is disabled."""
+
+    def test_totals_sum_shards_across_threads(self):
+        """Test that increments from many threads are all counted."""
+        collector = MetricsCollector(max_points=0)
+        threads = [
+            threading.Thread(
+                target=lambda: [collector.increment_counter("requests") for _ in range(500)]
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        collector.increment_counter("requests", 2.0)
+        self.assertEqual(collector.counter_totals()["requests"], 4002.0)
+        self.assertEqual(collector.get_summary()["counters"]["requests"], 4002.0)
+        self.assertIn("code_cobra_requests 4002.0", collector.export_prometheus())
+
+    def test_counters_view_includes_shards(self):
+        """Test that counters reads lock-free increments and is read-only."""
+        collector = MetricsCollector(max_points=0)
+        collector.increment_counter("manual")
+        collector.increment_counter("manual")
+        self.assertEqual(collector.counters["manual"], 2.0)
+        self.assertEqual(collector.counters["missing"], 0.0)
+        with self.assertRaises(TypeError):
+            collector.counters["manual"] += 1
+
+    def test_exited_thread_shards_are_folded(self):
+        """Test that shards of finished threads don't accumulate."""
+        collector = MetricsCollector(max_points=0)
+        for _ in range(20):
+            thread = threading.Thread(target=collector.increment_counter, args=("jobs",))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(collector.counter_totals()["jobs"], 20.0)
+        self.assertEqual(collector._counter_shards, [])
+
+    def test_totals_snapshot_is_detached(self):
+        """Test that mutating a totals snapshot does not change the counters."""
+        collector = MetricsCollector()
+        collector.increment_counter("requests")
+        collector.counter_totals()["requests"] = 100.0
+        self.assertEqual(collector.counter_totals()["requests"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()